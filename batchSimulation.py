@@ -0,0 +1,560 @@
+"""
+Lockstep simulation of many AI against AI games held as stacked NumPy arrays.
+
+Every step each unfinished game fires one shot, with the attack, the knowledge update and the win check
+done for all games at once. The knowledge rules follow knowledgeMap exactly, including the scans whose
+result depends on board order, so results match the object based engine statistically.
+"""
+import argparse
+import time
+
+import main
+from main import POSSIBLE, HIT, COMPLETED_SHIP, IMPOSSIBLE, CARDINAL_CHECK, LIKELY_CARDINAL, SHIP_CHECK
+
+numpy = main.numpy
+
+# decision rules, AI.chooseLocation and hardAI.chooseLocation
+RANDOM, DENSITY = range(0, 2)
+
+supportedClasses = {main.easyAI: RANDOM, main.mediumAI: RANDOM, main.hardAI: DENSITY}
+
+
+class batchResult(object):
+    """Outcome of a batch of games as arrays, one entry per game."""
+
+    def __init__(self, winners, shots, turns):
+        """
+        Save outcome arrays.
+        :param winners: numpy.ndarray, 0 if player one won, 1 if player two won.
+        :param shots: numpy.ndarray, games x 2, shots fired by each player.
+        :param turns: numpy.ndarray, volleys played.
+        """
+        self.winners = winners
+        self.shots = shots
+        self.turns = turns
+
+    def __len__(self):
+        return len(self.winners)
+
+    def wins(self):
+        """
+        Return the wins of player one and player two.
+        :return: Tuple of Int.
+        """
+        playerTwoWins = int(self.winners.sum())
+        return len(self.winners) - playerTwoWins, playerTwoWins
+
+
+class gameBatch(object):
+    """A batch of games between two AI classes advanced one shot at a time."""
+
+    def __init__(self, aiClassOne, aiClassTwo, mapSize, games, seed=None):
+        """
+        Place both fleets of every game and create empty knowledge.
+        :param aiClassOne: Class, one of supportedClasses.
+        :param aiClassTwo: Class, one of supportedClasses.
+        :param mapSize: Int, length of the maps.
+        :param games: Int, number of games in the batch.
+        :param seed: Int, seed for placement and every decision.
+        """
+        if numpy is None:
+            raise ImportError("batch simulation needs numpy")
+        for aiClass in (aiClassOne, aiClassTwo):
+            if aiClass not in supportedClasses:
+                raise ValueError("{} has no batch decision rule".format(aiClass.__name__))
+        self.length = mapSize
+        self.size = mapSize ** 2
+        self.games = games
+        self.random = numpy.random.default_rng(seed)
+        self.strategies = numpy.array([supportedClasses[aiClassOne], supportedClasses[aiClassTwo]])
+        self.ships = numpy.zeros((games, 2, self.size), dtype=bool)
+        self.fired = numpy.zeros((games, 2, self.size), dtype=bool)
+        self.missed = numpy.zeros((games, 2, self.size), dtype=bool)
+        self.knowledge = numpy.full((games, 2, self.size), POSSIBLE, dtype=numpy.int8)
+        self.remaining = numpy.zeros((games, 2), dtype=numpy.int32)
+        # ship covering each tile, -1 for none, with the length and tiles left afloat of each ship
+        self.shipIds = numpy.full((games, 2, self.size), -1, dtype=numpy.int32)
+        fleetShips = max(aiClass.fleetTiles for aiClass in (aiClassOne, aiClassTwo)) // 2
+        self.lengths = numpy.zeros((games, 2, fleetShips), dtype=numpy.int32)
+        self.health = numpy.zeros((games, 2, fleetShips), dtype=numpy.int32)
+        self.shots = numpy.zeros((games, 2), dtype=numpy.int32)
+        self.turns = numpy.ones(games, dtype=numpy.int32)
+        self.turn = numpy.zeros(games, dtype=numpy.int64)
+        self.winners = numpy.full(games, -1, dtype=numpy.int8)
+        self.active = numpy.arange(0, games)
+        self.neighbours = main.topology.forLength(mapSize).neighbours
+        self.__placeFleets(aiClassOne, aiClassTwo)
+
+    def __placeFleets(self, aiClassOne, aiClassTwo):
+        """
+        Place every fleet with the distribution of fleetPlacer.placeRandom, a length drawn uniformly from those
+        that still fit and then a uniform legal placement of it.
+        :param aiClassOne: Class.
+        :param aiClassTwo: Class.
+        """
+        for player, aiClass in enumerate((aiClassOne, aiClassTwo)):
+            shipTiles = numpy.full(self.games, aiClass.fleetTiles)
+            ships = numpy.zeros((self.games, self.length, self.length), dtype=bool)
+            shipIds = numpy.full((self.games, self.length, self.length), -1, dtype=numpy.int32)
+            placedShips = numpy.zeros(self.games, dtype=numpy.int32)
+            blocked = numpy.zeros((self.games, self.length, self.length), dtype=bool)
+            while (shipTiles > 1).any():
+                lengths = range(2, min(int(shipTiles.max()), self.length) + 1)
+                legal = [self.__legalPlacements(blocked, shipLength) for shipLength in lengths]
+                fits = numpy.stack([placements.any(axis=1) for placements in legal], axis=1)
+                fits &= numpy.array(lengths)[None, :] <= shipTiles[:, None]
+                placing = shipTiles > 1
+                if (placing & ~fits.any(axis=1)).any():
+                    raise main.FleetPlacementError(2, [int(shipTiles[placing & ~fits.any(axis=1)][0])])
+                chosen = numpy.where(fits, self.random.random(fits.shape), -1.0).argmax(axis=1)
+                for index, shipLength in enumerate(lengths):
+                    games = numpy.flatnonzero(placing & (chosen == index))
+                    if len(games) == 0:
+                        continue
+                    keys = numpy.where(legal[index][games], self.random.random(legal[index][games].shape), -1.0)
+                    placed = self.__placementTiles(keys.argmax(axis=1), shipLength)
+                    ships[games] |= placed
+                    shipIds[games] = numpy.where(placed, placedShips[games, None, None], shipIds[games])
+                    self.lengths[games, player, placedShips[games]] = shipLength
+                    self.health[games, player, placedShips[games]] = shipLength
+                    placedShips[games] += 1
+                    west, east, north, south = self.__shifted(placed)
+                    blocked[games] |= placed | west | east | north | south
+                    shipTiles[games] -= shipLength
+            self.ships[:, player] = ships.reshape(self.games, self.size)
+            self.shipIds[:, player] = shipIds.reshape(self.games, self.size)
+            self.remaining[:, player] = self.ships[:, player].sum(axis=1)
+
+    def __legalPlacements(self, blocked, shipLength):
+        """
+        Return every horizontal placement of a length followed by every vertical one, True where legal.
+        :param blocked: numpy.ndarray, games x length x length.
+        :param shipLength: Int.
+        :return: numpy.ndarray.
+        """
+        placements = []
+        for grid in (blocked, blocked.transpose(0, 2, 1)):
+            sums = self.__prefixSums(grid)
+            placements.append(((sums[:, :, shipLength:] - sums[:, :, :-shipLength]) == 0).reshape(len(blocked), -1))
+        return numpy.concatenate(placements, axis=1)
+
+    def __placementTiles(self, placements, shipLength):
+        """
+        Return the tiles covered by placements indexed as in __legalPlacements.
+        :param placements: numpy.ndarray.
+        :param shipLength: Int.
+        :return: numpy.ndarray, games x length x length.
+        """
+        starts = self.length - shipLength + 1
+        vertical = placements >= self.length * starts
+        placements = placements % (self.length * starts)
+        lines, firsts = placements // starts, placements % starts
+        steps = numpy.arange(0, shipLength)[None, :]
+        games = numpy.repeat(numpy.arange(0, len(placements)), shipLength)
+        rows = numpy.where(vertical[:, None], firsts[:, None] + steps, lines[:, None]).reshape(-1)
+        columns = numpy.where(vertical[:, None], lines[:, None], firsts[:, None] + steps).reshape(-1)
+        tiles = numpy.zeros((len(placements), self.length, self.length), dtype=bool)
+        tiles[games, rows, columns] = True
+        return tiles
+
+    def finished(self):
+        """
+        Return True once every game has a winner.
+        :return: Bool.
+        """
+        return len(self.active) == 0
+
+    def run(self):
+        """
+        Step until every game is over.
+        :return: batchResult.
+        """
+        while not self.finished():
+            self.step()
+        return batchResult(self.winners, self.shots, self.turns)
+
+    def step(self):
+        """Fire one shot in every unfinished game, update knowledge and retire finished games."""
+        games = self.active
+        attackers = self.turn[games]
+        defenders = 1 - attackers
+        knowledge = self.knowledge[games, attackers]
+        fired = self.fired[games, attackers]
+        priorities = self.__highestPriority(knowledge)
+        locations = self.__chooseLocations(games, attackers, knowledge, fired, priorities)
+
+        rows = numpy.arange(0, len(games))
+        hits = self.ships[games, defenders, locations]
+        newHits = hits & ~fired[rows, locations]
+        self.remaining[games[newHits], defenders[newHits]] -= 1
+        # the defender announces a sink when a new hit takes a ship's last tile, as map_.lastSunk
+        shipIds = self.shipIds[games, defenders, locations]
+        self.health[games[newHits], defenders[newHits], shipIds[newHits]] -= 1
+        sunk = newHits & (self.health[games, defenders, numpy.maximum(shipIds, 0)] == 0)
+        self.shots[games, attackers] += 1
+        self.fired[games, attackers, locations] = True
+        self.missed[games[~hits], attackers[~hits], locations[~hits]] = True
+        knowledge[rows, locations] = numpy.where(hits, HIT, IMPOSSIBLE)
+        self.__updateKnowledge(knowledge, locations, priorities, hits, sunk)
+        self.knowledge[games, attackers] = knowledge
+
+        won = hits & (self.remaining[games, defenders] == 0)
+        self.winners[games[won]] = attackers[won]
+        missedGames = games[~hits]
+        self.turn[missedGames] = 1 - self.turn[missedGames]
+        self.turns[missedGames] += 1
+        self.active = games[~won]
+
+    def __highestPriority(self, knowledge):
+        """
+        Return the highest priority entity code of each game, as knowledgeMap.highestPriority.
+        :param knowledge: numpy.ndarray, games x size.
+        :return: numpy.ndarray.
+        """
+        priorities = numpy.full(len(knowledge), POSSIBLE, dtype=numpy.int8)
+        undecided = numpy.ones(len(knowledge), dtype=bool)
+        for code in (LIKELY_CARDINAL, CARDINAL_CHECK, SHIP_CHECK):
+            present = undecided & (knowledge == code).any(axis=1)
+            priorities[present] = code
+            undecided &= ~present
+        return priorities
+
+    def __chooseLocations(self, games, attackers, knowledge, fired, priorities):
+        """
+        Return the location each attacker fires at, following its decision rule.
+        :param games: numpy.ndarray.
+        :param attackers: numpy.ndarray.
+        :param knowledge: numpy.ndarray, games x size.
+        :param fired: numpy.ndarray, games x size.
+        :param priorities: numpy.ndarray.
+        :return: numpy.ndarray.
+        """
+        candidates = knowledge == priorities[:, None]
+        # knowledge can wrongly rule out every tile, fall back to anywhere not yet fired at
+        empty = ~candidates.any(axis=1)
+        candidates[empty] = ~fired[empty]
+        scores = self.random.random(candidates.shape)
+        density = self.strategies[attackers] == DENSITY
+        if density.any():
+            unfired = candidates[density] & ~fired[density]
+            useDensity = unfired.any(axis=1) & ~empty[density]
+            rows = numpy.flatnonzero(density)[useDensity]
+            if len(rows) > 0:
+                blocked = ((knowledge[rows] == IMPOSSIBLE) | (knowledge[rows] == COMPLETED_SHIP) |
+                           self.missed[games[rows], attackers[rows]])
+                hits = knowledge[rows] == HIT
+                afloat = self.__afloatCounts(games[rows], 1 - attackers[rows])
+                # integer scores, the random part only breaks ties
+                scores[rows] = self.__densityScores(blocked, hits, afloat) + scores[rows] * 0.5
+                candidates[rows] = unfired[useDensity]
+        return numpy.where(candidates, scores, -1.0).argmax(axis=1)
+
+    def __afloatCounts(self, games, defenders):
+        """
+        Return how many of each defender's ships of each length are still afloat, as hardAI.shipCounts.
+        :param games: numpy.ndarray.
+        :param defenders: numpy.ndarray.
+        :return: numpy.ndarray, games x (longest ship + 1), indexed by length.
+        """
+        lengths = numpy.where(self.health[games, defenders] > 0, self.lengths[games, defenders], 0)
+        counts = numpy.zeros((len(games), self.lengths.max() + 1), dtype=numpy.int32)
+        for ship in range(0, lengths.shape[1]):
+            counts[numpy.arange(0, len(games)), lengths[:, ship]] += 1
+        counts[:, 0] = 0
+        return counts
+
+    def __densityScores(self, blocked, hits, afloat):
+        """
+        Return hardAI.densityScores for every game.
+        :param blocked: numpy.ndarray, games x size.
+        :param hits: numpy.ndarray, games x size.
+        :param afloat: numpy.ndarray, see __afloatCounts.
+        :return: numpy.ndarray, games x size.
+        """
+        shape = (len(blocked), self.length, self.length)
+        blocked = blocked.reshape(shape).astype(numpy.int32)
+        hits = hits.reshape(shape).astype(numpy.int32)
+        scores = self.__lineScores(blocked, hits, afloat)
+        scores += self.__lineScores(blocked.transpose(0, 2, 1), hits.transpose(0, 2, 1), afloat).transpose(0, 2, 1)
+        return scores.reshape(len(blocked), self.size)
+
+    def __lineScores(self, blocked, hits, afloat):
+        """
+        Return the weighted number of horizontal placements covering each tile of every game.
+        :param blocked: numpy.ndarray, games x length x length.
+        :param hits: numpy.ndarray, games x length x length.
+        :param afloat: numpy.ndarray, see __afloatCounts.
+        :return: numpy.ndarray.
+        """
+        blockedSums = self.__prefixSums(blocked)
+        hitSums = self.__prefixSums(hits)
+        columns = numpy.arange(0, self.length)
+        scores = numpy.zeros(blocked.shape)
+        for shipLength in range(2, min(afloat.shape[1] - 1, self.length) + 1):
+            ships = afloat[:, shipLength, None, None]
+            if not ships.any():
+                continue
+            free = (blockedSums[:, :, shipLength:] - blockedSums[:, :, :-shipLength]) == 0
+            weights = ships * free * (1 + main.hardAI.hitWeight *
+                                      (hitSums[:, :, shipLength:] - hitSums[:, :, :-shipLength]))
+            weightSums = self.__prefixSums(weights)
+            last = numpy.minimum(columns, self.length - shipLength) + 1
+            first = numpy.maximum(columns - shipLength + 1, 0)
+            scores += weightSums[:, :, last] - weightSums[:, :, first]
+        return scores
+
+    @staticmethod
+    def __prefixSums(grid):
+        """
+        Return running sums along the last axis, starting with zeros.
+        :param grid: numpy.ndarray.
+        :return: numpy.ndarray.
+        """
+        sums = numpy.zeros(grid.shape[:-1] + (grid.shape[-1] + 1,), dtype=numpy.int64)
+        numpy.cumsum(grid, axis=-1, out=sums[..., 1:])
+        return sums
+
+    def __neighbourHits(self, knowledge, locations, offsets):
+        """
+        Return True for each game with a hit at one of the offsets from its location.
+        :param knowledge: numpy.ndarray, games x size.
+        :param locations: numpy.ndarray.
+        :param offsets: Tuple of Int, cardinal offsets.
+        :return: numpy.ndarray.
+        """
+        found = numpy.zeros(len(locations), dtype=bool)
+        for offset in offsets:
+            valid = self.__validOffset(locations, offset)
+            neighbours = numpy.where(valid, locations + offset, 0)
+            found |= valid & (knowledge[numpy.arange(0, len(locations)), neighbours] == HIT)
+        return found
+
+    def __validOffset(self, locations, offset):
+        """
+        Return True where moving offset from a location stays on the map, as topology.validOffset.
+        :param locations: numpy.ndarray.
+        :param offset: Int.
+        :return: numpy.ndarray.
+        """
+        if offset == -1:
+            return locations % self.length > 0
+        if offset == +1:
+            return locations % self.length < self.length - 1
+        if offset == -self.length:
+            return locations >= self.length
+        return locations < self.size - self.length
+
+    def __setNeighbours(self, knowledge, rows, locations, offsets, code, unlessHit=False):
+        """
+        Set the cardinals at offsets from each location to code.
+        :param knowledge: numpy.ndarray, games x size.
+        :param rows: numpy.ndarray, rows of knowledge to change.
+        :param locations: numpy.ndarray, location for each row.
+        :param offsets: Tuple of Int.
+        :param code: Int.
+        :param unlessHit: Bool, leave hits untouched.
+        """
+        for offset in offsets:
+            valid = self.__validOffset(locations, offset)
+            targets = locations[valid] + offset
+            chosen = rows[valid]
+            if unlessHit:
+                keep = knowledge[chosen, targets] != HIT
+                chosen, targets = chosen[keep], targets[keep]
+            knowledge[chosen, targets] = code
+
+    def __updateKnowledge(self, knowledge, locations, priorities, hits, sunk):
+        """
+        Apply AI.__updateKnowledge to every game.
+        :param knowledge: numpy.ndarray, games x size.
+        :param locations: numpy.ndarray.
+        :param priorities: numpy.ndarray, entity code the shot was chosen from.
+        :param hits: numpy.ndarray.
+        :param sunk: numpy.ndarray, True where the shot sank a ship.
+        """
+        horizontals = (-1, +1)
+        verticals = (-self.length, +self.length)
+        cardinals = (-1, -self.length, +1, +self.length)
+
+        rows = numpy.flatnonzero(sunk)
+        if len(rows) > 0:
+            knowledge[rows] = self.__sunkShip(knowledge[rows])
+        # a sink ends the update, whatever the priority was
+        priorities = numpy.where(sunk, -1, priorities)
+        shipCheck = priorities == SHIP_CHECK
+        rows = numpy.flatnonzero(shipCheck & hits)
+        if len(rows) > 0:
+            # shipCheckHit
+            horizontal = self.__neighbourHits(knowledge[rows], locations[rows], horizontals)
+            vertical = ~horizontal & self.__neighbourHits(knowledge[rows], locations[rows], verticals)
+            self.__setNeighbours(knowledge, rows[horizontal], locations[rows][horizontal], horizontals,
+                                 SHIP_CHECK, True)
+            self.__setNeighbours(knowledge, rows[vertical], locations[rows][vertical], verticals, SHIP_CHECK, True)
+        rows = numpy.flatnonzero((priorities == POSSIBLE) & hits)
+        if len(rows) > 0:
+            self.__setNeighbours(knowledge, rows, locations[rows], cardinals, CARDINAL_CHECK)
+        cardinal = (priorities == CARDINAL_CHECK) | (priorities == LIKELY_CARDINAL)
+        rows = numpy.flatnonzero(cardinal)
+        if len(rows) == 0:
+            return
+        subset = knowledge[rows]
+        subset[subset == LIKELY_CARDINAL] = CARDINAL_CHECK
+        horizontal = self.__neighbourHits(subset, locations[rows], horizontals)
+        confirmed = hits[rows]
+        for chosen, method in ((confirmed & horizontal, self.__horizontalShip),
+                               (confirmed & ~horizontal, self.__verticalShip),
+                               (~confirmed & horizontal, self.__horizontalChecked),
+                               (~confirmed & ~horizontal, self.__verticalChecked)):
+            if chosen.any():
+                subset[chosen] = method(subset[chosen])
+        knowledge[rows] = subset
+
+    def __grid(self, knowledge):
+        """
+        Return knowledge as games x length x length.
+        :param knowledge: numpy.ndarray, games x size.
+        :return: numpy.ndarray.
+        """
+        return numpy.ascontiguousarray(knowledge).reshape(len(knowledge), self.length, self.length)
+
+    def __shifted(self, grid):
+        """
+        Return the value of the west, east, north and south cardinal of every tile, False off the map.
+        :param grid: numpy.ndarray of Bool, games x length x length.
+        :return: Tuple of numpy.ndarray.
+        """
+        west = numpy.zeros_like(grid)
+        east = numpy.zeros_like(grid)
+        north = numpy.zeros_like(grid)
+        south = numpy.zeros_like(grid)
+        west[:, :, 1:] = grid[:, :, :-1]
+        east[:, :, :-1] = grid[:, :, 1:]
+        north[:, 1:, :] = grid[:, :-1, :]
+        south[:, :-1, :] = grid[:, 1:, :]
+        return west, east, north, south
+
+    def __shipLines(self, knowledge, horizontalCheck):
+        """
+        Apply knowledgeMap.horizontalShip or verticalShip, neither depends on board order.
+        :param knowledge: numpy.ndarray, games x size.
+        :param horizontalCheck: Bool, True for horizontalShip.
+        :return: numpy.ndarray.
+        """
+        grid = self.__grid(knowledge).copy()
+        west, east, north, south = self.__shifted(grid == HIT)
+        hasHorizontal = west | east
+        hasVertical = north | south
+        open_ = (grid != HIT) & (grid != COMPLETED_SHIP)
+        grid[grid == CARDINAL_CHECK] = IMPOSSIBLE
+        if horizontalCheck:
+            grid[hasVertical & open_] = IMPOSSIBLE
+            grid[hasHorizontal & open_] = SHIP_CHECK
+        else:
+            grid[hasHorizontal & open_] = IMPOSSIBLE
+            grid[~hasHorizontal & hasVertical & open_] = SHIP_CHECK
+        return grid.reshape(len(knowledge), self.size)
+
+    def __horizontalShip(self, knowledge):
+        return self.__shipLines(knowledge, True)
+
+    def __verticalShip(self, knowledge):
+        return self.__shipLines(knowledge, False)
+
+    def __horizontalChecked(self, knowledge):
+        """
+        Apply knowledgeMap.horizontalChecked, row by row as a hit can turn into a likelyCardinal.
+        :param knowledge: numpy.ndarray, games x size.
+        :return: numpy.ndarray.
+        """
+        grid = self.__grid(knowledge).copy()
+        for row in range(0, self.length):
+            vertical = numpy.zeros(grid[:, row, :].shape, dtype=bool)
+            if row > 0:
+                vertical |= grid[:, row - 1, :] == HIT
+            if row < self.length - 1:
+                vertical |= grid[:, row + 1, :] == HIT
+            grid[:, row, :][vertical] = LIKELY_CARDINAL
+        return grid.reshape(len(knowledge), self.size)
+
+    def __verticalChecked(self, knowledge):
+        """
+        Apply knowledgeMap.verticalChecked, column by column as a hit can turn into a likelyCardinal.
+        :param knowledge: numpy.ndarray, games x size.
+        :return: numpy.ndarray.
+        """
+        grid = self.__grid(knowledge).copy()
+        for column in range(0, self.length):
+            horizontal = numpy.zeros(grid[:, :, column].shape, dtype=bool)
+            if column > 0:
+                horizontal |= grid[:, :, column - 1] == HIT
+            if column < self.length - 1:
+                horizontal |= grid[:, :, column + 1] == HIT
+            grid[:, :, column][horizontal] = LIKELY_CARDINAL
+        return grid.reshape(len(knowledge), self.size)
+
+    def __sunkShip(self, knowledge):
+        """
+        Apply knowledgeMap.sunkShip, tile by tile in board order as the result depends on it.
+        :param knowledge: numpy.ndarray, games x size.
+        :return: numpy.ndarray.
+        """
+        knowledge = knowledge.copy()
+        ships = (knowledge == HIT) | (knowledge == COMPLETED_SHIP)
+        west, east, north, south = self.__shifted(ships.reshape(len(knowledge), self.length, self.length))
+        region = (ships | (west | east | north | south).reshape(ships.shape)).any(axis=0)
+        for location in numpy.flatnonzero(region):
+            column = knowledge[:, location]
+            column[column == HIT] = COMPLETED_SHIP
+            adjacent = numpy.zeros(len(knowledge), dtype=bool)
+            for neighbour in self.neighbours[location]:
+                adjacent |= knowledge[:, neighbour] == COMPLETED_SHIP
+            column[adjacent] = IMPOSSIBLE
+        return knowledge
+
+
+def simulateBatch(aiClassOne, aiClassTwo, mapSize, games, seed=None, batchSize=4096):
+    """
+    Play games in lockstep batches and return the combined outcome.
+    :param aiClassOne: Class, one of supportedClasses.
+    :param aiClassTwo: Class, one of supportedClasses.
+    :param mapSize: Int, length of the maps.
+    :param games: Int, number of games.
+    :param seed: Int, seed each batch seed is derived from.
+    :param batchSize: Int, games held in memory at once.
+    :return: batchResult.
+    """
+    results = []
+    for index, start in enumerate(range(0, games, batchSize)):
+        batchSeed = main.deriveSeed(seed, index) if seed is not None else None
+        results.append(gameBatch(aiClassOne, aiClassTwo, mapSize, min(batchSize, games - start), batchSeed).run())
+    return batchResult(numpy.concatenate([result.winners for result in results]),
+                       numpy.concatenate([result.shots for result in results]),
+                       numpy.concatenate([result.turns for result in results]))
+
+
+def run():
+    """Parse arguments, play the games and print the wins and averages."""
+    classes = {aiClass.__name__: aiClass for aiClass in supportedClasses}
+    parser = argparse.ArgumentParser(description="Play AI against AI games in lockstep NumPy batches.")
+    parser.add_argument("playerOne", choices=sorted(classes))
+    parser.add_argument("playerTwo", choices=sorted(classes))
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=4096, dest="batchSize")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulateBatch(classes[arguments.playerOne], classes[arguments.playerTwo], arguments.size,
+                           arguments.games, arguments.seed, arguments.batchSize)
+    elapsed = time.perf_counter() - start
+    playerOneWins, playerTwoWins = result.wins()
+    print("{} wins: {}".format(arguments.playerOne, playerOneWins))
+    print("{} wins: {}".format(arguments.playerTwo, playerTwoWins))
+    print("Mean shots: {:.2f} / {:.2f}, mean turns: {:.2f}".format(result.shots[:, 0].mean(),
+                                                                 result.shots[:, 1].mean(), result.turns.mean()))
+    print("{:.0f} games/s".format(len(result) / elapsed))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,222 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+
+import externals.openingBook
+import main
+
+aiClasses = [main.easyAI, main.mediumAI, main.hardAI]
+
+
+def resetCaches():
+    """Empty what AIs remember between games, so every round starts as cold as the first."""
+    main.hardAI.decisions.clear()
+    externals.openingBook.shared = externals.openingBook.openingBook()
+
+
+class callTimer(object):
+    """
+    Times calls of a function as timeit does, with garbage collection off and, from the first round on,
+    enough calls per round to take 0.2 seconds.
+    """
+
+    def __init__(self, function):
+        """
+        :param function: Callable, takes no arguments.
+        """
+        self.timer = timeit.Timer(function)
+        self.calls = None
+
+    def __call__(self):
+        """
+        Return the mean time of a call in seconds over one round.
+        :return: Float.
+        """
+        if self.calls is None:
+            self.calls = self.timer.autorange()[0]
+        return self.timer.timeit(self.calls) / self.calls
+
+
+def percentile(values, fraction):
+    """
+    Return the value below which fraction of the sorted values fall.
+    :param values: List of Float, sorted.
+    :param fraction: Float, between 0 and 1.
+    :return: Float.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def placeFleet(aiClass, mapSize):
+    """
+    Place an AI class's fleet on a fresh map, as the AI does when it is created.
+    :param aiClass: Class.
+    :param mapSize: Int.
+    """
+    aiClass.placeFleet(aiClass.mapClass(mapSize))
+
+
+def attackLatencies(aiClass, mapSize, games):
+    """
+    Return the time of every AI.attack call while clearing mediumAI fleets.
+    :param aiClass: Class.
+    :param mapSize: Int.
+    :param games: Int.
+    :return: List of Float, sorted.
+    """
+    latencies = []
+    for i in range(0, games):
+        attacker = aiClass(mapSize)
+        attacker.targetMap = main.mediumAI(mapSize).map
+        while attacker.targetMap.hasShips():
+            start = time.perf_counter()
+            attacker.attack()
+            latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def gamesPerSecond(aiClass, mapSize, games):
+    """
+    Return the number of full games of aiClass against itself played per second.
+    :param aiClass: Class.
+    :param mapSize: Int.
+    :param games: Int.
+    :return: Float.
+    """
+    start = time.perf_counter()
+    for i in range(0, games):
+        main.playGame(aiClass, aiClass, mapSize)
+    return games / (time.perf_counter() - start)
+
+
+def sizeBenchmarks(mapSize, games):
+    """
+    Return the benchmarks of a board size, each measuring one round.
+    :param mapSize: Int.
+    :param games: Int, games played for the per move and per game benchmarks.
+    :return: List of Callable, each returning a Dict, metric name to {"value", "unit", "higherIsBetter"}.
+    """
+    benchmarks = []
+    for mapClass in (main.map_, main.bitMap, main.knowledgeMap):
+        timer = callTimer(lambda mapClass=mapClass: mapClass(mapSize))
+        benchmarks.append(lambda name="construct.{}.{}".format(mapClass.__name__, mapSize), timer=timer: {
+            name: {"value": timer() * 1e6, "unit": "us", "higherIsBetter": False}})
+    for aiClass in aiClasses:
+        name = aiClass.__name__
+        try:
+            placeFleet(aiClass, mapSize)
+        except main.FleetPlacementError:
+            print("Skipping {} at size {}, its fleet does not fit".format(name, mapSize))
+            continue
+        timer = callTimer(lambda aiClass=aiClass: placeFleet(aiClass, mapSize))
+        benchmarks.append(lambda name=name, timer=timer: {"placement.{}.{}".format(name, mapSize): {
+            "value": timer() * 1e6, "unit": "us", "higherIsBetter": False}})
+        benchmarks.append(lambda name=name, aiClass=aiClass: attackMetrics(name, aiClass, mapSize, games))
+        benchmarks.append(lambda name=name, aiClass=aiClass: {"games.{}.{}".format(name, mapSize): {
+            "value": gamesPerSecond(aiClass, mapSize, games), "unit": "games/s", "higherIsBetter": True}})
+    return benchmarks
+
+
+def attackMetrics(name, aiClass, mapSize, games):
+    """
+    Return the median and 99th percentile of AI.attack calls.
+    :param name: String, name of the AI in the metric names.
+    :param aiClass: Class.
+    :param mapSize: Int.
+    :param games: Int.
+    :return: Dict, metric name to {"value", "unit", "higherIsBetter"}.
+    """
+    latencies = attackLatencies(aiClass, mapSize, games)
+    return {"attack.p50.{}.{}".format(name, mapSize): {
+                "value": percentile(latencies, 0.5) * 1e6, "unit": "us", "higherIsBetter": False},
+            "attack.p99.{}.{}".format(name, mapSize): {
+                "value": percentile(latencies, 0.99) * 1e6, "unit": "us", "higherIsBetter": False}}
+
+
+def runBenchmarks(sizes, games, seed, rounds=5):
+    """
+    Run every benchmark for each board size rounds times and keep each metric's best round.
+    Every benchmark runs once per round, so a slow spell of the machine slows a round of each benchmark
+    rather than every round of a few, and every round replays the same games from empty caches.
+    :param sizes: List of Int.
+    :param games: Int, games played for the per move and per game benchmarks.
+    :param seed: Int.
+    :param rounds: Int.
+    :return: Dict, metric name to {"value", "unit", "higherIsBetter"}.
+    """
+    benchmarks = []
+    for mapSize in sizes:
+        benchmarks += sizeBenchmarks(mapSize, games)
+    results = {}
+    for i in range(0, rounds):
+        for benchmark in benchmarks:
+            random.seed(seed)
+            resetCaches()
+            for name, metric in benchmark().items():
+                best = results.get(name)
+                if best is None or (metric["value"] > best["value"] if metric["higherIsBetter"]
+                                    else metric["value"] < best["value"]):
+                    results[name] = metric
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Return the metrics that got worse than the baseline by more than threshold.
+    :param results: Dict, current metrics.
+    :param baseline: Dict, saved metrics.
+    :param threshold: Float, allowed relative change.
+    :return: List of Tuple, (name, baseline value, current value, relative change).
+    """
+    regressions = []
+    for name, metric in sorted(results.items()):
+        if name not in baseline:
+            continue
+        old = baseline[name]["value"]
+        new = metric["value"]
+        if old == 0:
+            continue
+        change = (new - old) / old
+        if metric["higherIsBetter"]:
+            change = -change
+        if change > threshold:
+            regressions.append((name, old, new, change))
+    return regressions
+
+
+def run():
+    """Parse arguments, run the benchmarks and write or compare results."""
+    parser = argparse.ArgumentParser(description="Benchmark placement, AI moves and full games.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 50])
+    parser.add_argument("--games", type=int, default=20, help="games per per-move and per-game benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=5, help="times each benchmark is run, the best is kept")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown counted as a regression")
+    arguments = parser.parse_args()
+
+    results = runBenchmarks(arguments.sizes, arguments.games, arguments.seed, arguments.rounds)
+    with open(arguments.output, "w") as outputFile:
+        json.dump({"python": platform.python_version(), "numpy": main.numpy is not None,
+                   "created": time.time(), "results": results}, outputFile, indent=2, sort_keys=True)
+    for name, metric in sorted(results.items()):
+        print("{:<36} {:>14.2f} {}".format(name, metric["value"], metric["unit"]))
+    if arguments.compare is None:
+        return 0
+    with open(arguments.compare) as baselineFile:
+        baseline = json.load(baselineFile)["results"]
+    regressions = compare(results, baseline, arguments.threshold)
+    for name, old, new, change in regressions:
+        print("REGRESSION {:<36} {:.2f} -> {:.2f} ({:+.0%})".format(name, old, new, change))
+    if not regressions:
+        print("No regressions against {}".format(arguments.compare))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
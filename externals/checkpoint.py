@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+
+VERSION = 1
+
+
+def syncDirectory(path):
+    """
+    Flush the directory holding path to disk, so a rename into it survives a crash. Only possible on POSIX.
+    :param path: String.
+    """
+    if os.name != "posix":
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def save(path, data):
+    """
+    Replace the file at path with data in one step, so a crash leaves either the old or the new file.
+    The temporary file is removed if anything fails before the rename.
+    :param path: String.
+    :param data: Bytes.
+    """
+    temporaryPath = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(temporaryPath, "wb") as checkpointFile:
+            checkpointFile.write(data)
+            checkpointFile.flush()
+            os.fsync(checkpointFile.fileno())
+        os.replace(temporaryPath, path)
+    except BaseException:
+        try:
+            os.remove(temporaryPath)
+        except OSError:
+            pass
+        raise
+    syncDirectory(path)
+
+
+def load(path):
+    """
+    Return the state saved at path, None if there is no checkpoint.
+    Checkpoints are plain JSON, so a stray or tampered file can at worst be rejected, never run code.
+    :param path: String.
+    :return: Dict.
+    """
+    try:
+        with open(path) as checkpointFile:
+            saved = json.load(checkpointFile)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        raise ValueError("{} is not a checkpoint".format(path))
+    if not isinstance(saved, dict) or saved.get("version") != VERSION or not isinstance(saved.get("state"), dict):
+        raise ValueError("{} is not a version {} checkpoint".format(path, VERSION))
+    return saved["state"]
+
+
+class checkpointWriter(object):
+    """
+    Saves checkpoints from a background thread. The caller only pays for encoding the state as JSON,
+    and a checkpoint still being written is replaced by the newest one rather than queued behind it.
+    """
+
+    def __init__(self, path):
+        """
+        Start the thread writing checkpoints to path.
+        :param path: String.
+        """
+        self.path = path
+        self.pending = None
+        self.closed = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.worker = threading.Thread(target=self.__write, daemon=True)
+        self.worker.start()
+
+    def __write(self):
+        """Save each pending checkpoint until closed."""
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                data = self.pending
+                self.pending = None
+            try:
+                save(self.path, data)
+            except OSError as error:
+                self.error = error
+
+    def write(self, state):
+        """
+        Hand a checkpoint to the thread.
+        :param state: Dict, of what json can encode, encoded now so later changes to it are not saved.
+        """
+        if self.error is not None:
+            raise self.error
+        data = json.dumps({"version": VERSION, "state": state}).encode()
+        with self.condition:
+            self.pending = data
+            self.condition.notify()
+
+    def close(self):
+        """Wait for the last checkpoint to be saved and stop the thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.worker.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
@@ -0,0 +1,130 @@
+import sys
+import threading
+from collections import OrderedDict
+
+MASK = 2 ** 64 - 1
+# codes hashed per location, knowledge codes followed by codes for a missed shot and for any shot
+CODES_PER_LOCATION = 9
+tables = {}
+
+
+def zobristKey(index):
+    """
+    Return the 64 bit Zobrist key of an index, mixed with splitmix64 so any process computes the same keys.
+    :param index: Int, location * CODES_PER_LOCATION + code.
+    :return: Int.
+    """
+    key = (index + 1) * 0x9E3779B97F4A7C15 & MASK
+    key = (key ^ (key >> 30)) * 0xBF58476D1CE4E5B9 & MASK
+    key = (key ^ (key >> 27)) * 0x94D049BB133111EB & MASK
+    return key ^ (key >> 31)
+
+
+def zobristTable(size):
+    """
+    Return the Zobrist keys of every location and code of a map size, shared between maps.
+    :param size: Int, number of locations.
+    :return: List of Int.
+    """
+    if size not in tables:
+        tables[size] = [zobristKey(index) for index in range(0, size * CODES_PER_LOCATION)]
+    return tables[size]
+
+
+def _tupleSize(item):
+    """
+    Return the bytes of a tuple with the ints and tuples inside it.
+    :param item: Tuple.
+    :return: Int.
+    """
+    return sys.getsizeof(item) + sum(_tupleSize(part) if isinstance(part, tuple) else sys.getsizeof(part)
+                                     for part in item if isinstance(part, (int, tuple)))
+
+
+def entrySize(key, value):
+    """
+    Return roughly how many bytes an entry holds, counting tuples and the ints and tuples inside them.
+    Other objects inside tuples, such as classes, are shared between entries and not counted.
+    :param key: Hashable.
+    :param value: Object.
+    :return: Int.
+    """
+    return sum(_tupleSize(item) if isinstance(item, tuple) else sys.getsizeof(item) for item in (key, value))
+
+
+class lruCache(object):
+    """
+    Mapping bounded by an estimate of its memory use, evicting the least recently used entries first.
+    Safe to share between threads, such as the AI threads of server.py.
+    """
+
+    def __init__(self, maxBytes=32 * 2 ** 20, sizeOf=entrySize):
+        """
+        Create an empty cache.
+        :param maxBytes: Int, memory the entries may use, 0 to cache nothing.
+        :param sizeOf: Callable, taking a key and value and returning their size in bytes.
+        """
+        self.maxBytes = maxBytes
+        self.sizeOf = sizeOf
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Return the value of a key and mark it as recently used, None if it is not cached.
+        :param key: Hashable.
+        :return: Object.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Cache a value, evicting old entries until the cache is back under maxBytes.
+        :param key: Hashable.
+        :param value: Object, not None.
+        """
+        size = self.sizeOf(key, value)
+        if size > self.maxBytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.maxBytes:
+                key, (value, size) = self.entries.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Return the counters and memory use.
+        :return: Dict.
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self.entries),
+                "bytes": self.bytes, "hitRate": self.hits / lookups if lookups > 0 else None}
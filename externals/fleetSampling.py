@@ -0,0 +1,160 @@
+import random
+import time
+
+# attempts at placing one ship before the sample is abandoned
+PLACEMENT_ATTEMPTS = 50
+
+
+class fleetSampler(object):
+    """
+    Draws random fleets consistent with what is known of a map: no ship on a blocked tile, every hit covered,
+    and no two ships on cardinally adjacent tiles, the rule fleetPlacer and ship.validShipLocation enforce.
+    """
+
+    def __init__(self, length, blocked, hits, shipTiles, rng=None):
+        """
+        Save what every fleet must agree with.
+        :param length: Int, length of the map.
+        :param blocked: Iterable of Index, tiles no ship can be on.
+        :param hits: Iterable of Index, tiles of ships that are not known to be sunk.
+        :param shipTiles: Int, ship tiles not known to be sunk, including the hits.
+        :param rng: random.Random, defaults to the random module.
+        """
+        self.length = length
+        self.blocked = bytearray(length ** 2)
+        for location in blocked:
+            self.blocked[location] = 1
+        self.hits = list(hits)
+        self.shipTiles = shipTiles
+        self.random = random if rng is None else rng
+
+    def neighbours(self, location):
+        """
+        Return the cardinals of a location that are on the map.
+        :param location: Index.
+        :return: List.
+        """
+        row, column = divmod(location, self.length)
+        locations = []
+        if column > 0:
+            locations.append(location - 1)
+        if row > 0:
+            locations.append(location - self.length)
+        if column < self.length - 1:
+            locations.append(location + 1)
+        if row < self.length - 1:
+            locations.append(location + self.length)
+        return locations
+
+    def fits(self, tiles, taken, hits):
+        """
+        Return True if a ship can lie on tiles without touching a blocked tile, another ship or a hit it does not cover.
+        :param tiles: List of Index.
+        :param taken: Bytearray, 1 on tiles of ships already drawn.
+        :param hits: Set of Index, every hit.
+        :return: Bool.
+        """
+        for location in tiles:
+            if self.blocked[location] or taken[location]:
+                return False
+            for index in self.neighbours(location):
+                if taken[index] or (index in hits and index not in tiles):
+                    return False
+        return True
+
+    def shipTilesAt(self, start, length, vertical):
+        """
+        Return the tiles of a ship, None if it runs off the map.
+        :param start: Index, westmost or northmost tile.
+        :param length: Int.
+        :param vertical: Bool.
+        :return: List of Index.
+        """
+        row, column = divmod(start, self.length)
+        if vertical:
+            if row + length > self.length:
+                return None
+            return [start + self.length * i for i in range(0, length)]
+        if column + length > self.length:
+            return None
+        return [start + i for i in range(0, length)]
+
+    def sample(self):
+        """
+        Return the tiles of one random fleet, ships through the hits first, then ships anywhere.
+        :return: List of Index, None if this draw could not be completed.
+        """
+        rng = self.random
+        hitSet = set(self.hits)
+        uncovered = set(self.hits)
+        taken = bytearray(self.length ** 2)
+        fleet = []
+        tilesLeft = self.shipTiles
+        while uncovered:
+            # hits are known ships, so they are covered even once the expected ship tiles run out
+            maxLength = min(max(tilesLeft, 2), self.length)
+            hit = rng.choice(sorted(uncovered))
+            for attempt in range(0, PLACEMENT_ATTEMPTS):
+                length = rng.randint(2, maxLength)
+                vertical = rng.random() < 0.5
+                step = self.length if vertical else 1
+                tiles = self.shipTilesAt(hit - step * rng.randrange(0, length), length, vertical)
+                if tiles is not None and hit in tiles and self.fits(tiles, taken, hitSet):
+                    break
+            else:
+                return None
+            for location in tiles:
+                taken[location] = 1
+            fleet += tiles
+            uncovered.difference_update(tiles)
+            tilesLeft -= length
+        while tilesLeft > 1:
+            for attempt in range(0, PLACEMENT_ATTEMPTS):
+                length = rng.randint(2, min(tilesLeft, self.length))
+                vertical = rng.random() < 0.5
+                tiles = self.shipTilesAt(rng.randrange(0, self.length ** 2), length, vertical)
+                if tiles is not None and self.fits(tiles, taken, hitSet):
+                    break
+            else:
+                return None
+            for location in tiles:
+                taken[location] = 1
+            fleet += tiles
+            tilesLeft -= length
+        return fleet
+
+    def coverage(self, deadline, maxSamples=None):
+        """
+        Draw fleets until the deadline or until maxSamples draws were made, counting how often each tile is covered.
+        Nothing is drawn once the deadline has passed.
+        :param deadline: Float, time.time() to stop at, None for no limit.
+        :param maxSamples: Int, most draws including those abandoned, None for no limit.
+        :return: Tuple, (List of Int counts per tile, Int fleets drawn).
+        """
+        counts = [0] * self.length ** 2
+        samples = 0
+        attempts = 0
+        while (maxSamples is None or attempts < maxSamples) and (deadline is None or time.time() < deadline):
+            attempts += 1
+            fleet = self.sample()
+            if fleet is not None:
+                samples += 1
+                for location in fleet:
+                    counts[location] += 1
+        return counts, samples
+
+
+def coverage(length, blocked, hits, shipTiles, deadline, maxSamples, seed):
+    """
+    Return fleetSampler.coverage for a fresh sampler, the task run by each worker of a pool.
+    The deadline is wall clock time, so it means the same in every process however late the task starts.
+    :param length: Int, length of the map.
+    :param blocked: List of Index.
+    :param hits: List of Index.
+    :param shipTiles: Int.
+    :param deadline: Float, time.time() to stop at, None for no limit.
+    :param maxSamples: Int, None for no limit.
+    :param seed: Int.
+    :return: Tuple, (List of Int, Int).
+    """
+    return fleetSampler(length, blocked, hits, shipTiles, random.Random(seed)).coverage(deadline, maxSamples)
@@ -0,0 +1,273 @@
+import os
+import mmap
+import struct
+import sys
+from array import array
+
+# every field is little endian and every record starts on a four byte boundary
+FILE_HEADER = struct.Struct("<4sH2x")
+# the header is followed by both players' names, of the lengths given, padded to four bytes
+GAME_HEADER = struct.Struct("<QIBBBxIH2x")
+SHIP = struct.Struct("<IHbx")
+INDEX = struct.Struct("<Q")
+MAGIC = b"BSGR"
+VERSION = 2
+NO_SEED = 2 ** 64 - 1
+
+
+class RecordFormatError(Exception):
+    """Raised when a file is not a game record file."""
+
+    def __init__(self, path):
+        self.path = path
+        super().__init__("{} is not a version {} game record file".format(path, VERSION))
+
+
+class gameRecord(object):
+    """Everything needed to replay or analyse a single game."""
+
+    def __init__(self, seed, mapSize, players, winner, fleets, shots):
+        """
+        Save a game.
+        :param seed: Int, seed the game was played with, None if unknown.
+        :param mapSize: Int, length of the maps.
+        :param players: Tuple of String, class names of player one and player two.
+        :param winner: Int, 0 if player one won, 1 if player two won.
+        :param fleets: Tuple of List, (startingPos, length, offset) of every ship of player one and player two.
+        :param shots: array, every shot in order encoded as location << 2 | player << 1 | hit.
+        """
+        self.seed = seed
+        self.mapSize = mapSize
+        self.players = players
+        self.winner = winner
+        self.fleets = fleets
+        self.shots = shots
+
+    def iterShots(self):
+        """
+        Yield every shot in order.
+        :return: Generator of Tuple, (player, location, hit).
+        """
+        for shot in self.shots:
+            yield (shot >> 1) & 1, shot >> 2, shot & 1 == 1
+
+    def encode(self):
+        """
+        Return the record as bytes.
+        :return: Bytes.
+        """
+        if self.seed is not None and not 0 <= self.seed < NO_SEED:
+            raise ValueError("seed {} does not fit in a game record".format(self.seed))
+        seed = NO_SEED if self.seed is None else self.seed
+        names = [name.encode() for name in self.players]
+        for name in names:
+            if len(name) > 255:
+                raise ValueError("player name {} does not fit in a game record".format(name.decode()))
+        ships = [(player, ship) for player in (0, 1) for ship in self.fleets[player]]
+        parts = [GAME_HEADER.pack(seed, self.mapSize, len(names[0]), len(names[1]), self.winner, len(self.shots),
+                                  len(ships)), names[0], names[1], bytes(namePadding(len(names[0]) + len(names[1])))]
+        for player, (startingPos, length, offset) in ships:
+            # sign of the stored offset holds the orientation, player two ships are flagged by a magnitude of 2
+            direction = (-1 if offset < 0 else 1) * (player + 1)
+            parts.append(SHIP.pack(startingPos, length, direction))
+        shots = array("I", self.shots)
+        if sys.byteorder == "big":
+            shots.byteswap()
+        parts.append(shots.tobytes())
+        return b"".join(parts)
+
+    @staticmethod
+    def decode(data, offset):
+        """
+        Return the record starting at offset and the offset of the next one.
+        :param data: Buffer, whole record file.
+        :param offset: Int.
+        :return: Tuple, (gameRecord, Int).
+        """
+        seed, mapSize, lengthOne, lengthTwo, winner, shotCount, shipCount = GAME_HEADER.unpack_from(data, offset)
+        offset += GAME_HEADER.size
+        players = (bytes(data[offset:offset + lengthOne]).decode(),
+                   bytes(data[offset + lengthOne:offset + lengthOne + lengthTwo]).decode())
+        offset += lengthOne + lengthTwo + namePadding(lengthOne + lengthTwo)
+        fleets = ([], [])
+        for i in range(0, shipCount):
+            startingPos, length, direction = SHIP.unpack_from(data, offset)
+            offset += SHIP.size
+            fleets[abs(direction) - 1].append((startingPos, length, 1 if direction > 0 else -mapSize))
+        shots = array("I")
+        shots.frombytes(data[offset:offset + 4 * shotCount])
+        if sys.byteorder == "big":
+            shots.byteswap()
+        offset += 4 * shotCount
+        return gameRecord(None if seed == NO_SEED else seed, mapSize, players, winner, fleets, shots), offset
+
+
+def namePadding(length):
+    """
+    Return the bytes of padding after player names of a total length, keeping the record four byte aligned.
+    :param length: Int.
+    :return: Int.
+    """
+    return -length % 4
+
+
+def recordEnd(data, offset):
+    """
+    Return where the record starting at offset ends, or None if its header runs past the data.
+    :param data: Buffer, whole record file.
+    :param offset: Int.
+    :return: Int.
+    """
+    if offset + GAME_HEADER.size > len(data):
+        return None
+    seed, mapSize, lengthOne, lengthTwo, winner, shotCount, shipCount = GAME_HEADER.unpack_from(data, offset)
+    names = lengthOne + lengthTwo + namePadding(lengthOne + lengthTwo)
+    return offset + GAME_HEADER.size + names + SHIP.size * shipCount + 4 * shotCount
+
+
+def scanOffsets(data, path):
+    """
+    Return the offset of every complete record and the end of the last one by walking the record headers.
+    :param data: Buffer, whole record file.
+    :param path: String, for error reporting.
+    :return: Tuple, (array of offsets, Int).
+    """
+    if len(data) < FILE_HEADER.size or FILE_HEADER.unpack_from(data, 0) != (MAGIC, VERSION):
+        raise RecordFormatError(path)
+    offsets = array("Q")
+    offset = FILE_HEADER.size
+    while True:
+        end = recordEnd(data, offset)
+        if end is None or end > len(data):
+            break
+        offsets.append(offset)
+        offset = end
+    return offsets, offset
+
+
+class recordWriter(object):
+    """Appends games to a record file as they finish, together with a fixed width index of their offsets."""
+
+    def __init__(self, path, bufferSize=1 << 16, keep=None):
+        """
+        Open or create the record file, dropping a record left half written by a crash.
+        :param path: String.
+        :param bufferSize: Int, bytes buffered before writing to disk.
+        :param keep: Int, games to keep from an existing file, dropping any after them, None to keep all.
+        """
+        self.path = path
+        indexPath = path + ".idx"
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "r+b") as dataFile:
+                with mmap.mmap(dataFile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    offsets, end = scanOffsets(data, path)
+                if keep is not None and keep < len(offsets):
+                    end = offsets[keep]
+                    offsets = offsets[:keep]
+                dataFile.truncate(end)
+            if not os.path.exists(indexPath) or os.path.getsize(indexPath) != INDEX.size * len(offsets):
+                with open(indexPath, "wb") as indexFile:
+                    indexFile.write(b"".join(INDEX.pack(offset) for offset in offsets))
+            self.dataFile = open(path, "ab", buffering=bufferSize)
+            self.count = len(offsets)
+        else:
+            self.dataFile = open(path, "wb", buffering=bufferSize)
+            self.dataFile.write(FILE_HEADER.pack(MAGIC, VERSION))
+            open(indexPath, "wb").close()
+            self.count = 0
+        self.indexFile = open(indexPath, "ab", buffering=bufferSize)
+        self.offset = self.dataFile.tell()
+
+    def write(self, record):
+        """
+        Append a game.
+        :param record: gameRecord.
+        """
+        encoded = record.encode()
+        self.dataFile.write(encoded)
+        self.indexFile.write(INDEX.pack(self.offset))
+        self.offset += len(encoded)
+        self.count += 1
+
+    def flush(self):
+        """Write buffered games to disk, data before index so the index never points past the data."""
+        self.dataFile.flush()
+        self.indexFile.flush()
+
+    def close(self):
+        self.flush()
+        self.dataFile.close()
+        self.indexFile.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+class recordReader(object):
+    """Memory maps a record file, giving indexed and streaming access without loading every game."""
+
+    def __init__(self, path):
+        """
+        Map the record file and its index, rebuilding the index from the headers if it is missing or stale.
+        An index is stale unless its last game ends exactly where the file does, so a short index is never trusted.
+        :param path: String.
+        """
+        self.path = path
+        self.dataFile = open(path, "rb")
+        self.data = mmap.mmap(self.dataFile.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = None
+        indexPath = path + ".idx"
+        if os.path.exists(indexPath) and os.path.getsize(indexPath) >= INDEX.size:
+            with open(indexPath, "rb") as indexFile:
+                index = mmap.mmap(indexFile.fileno(), 0, access=mmap.ACCESS_READ)
+            count = len(index) // INDEX.size
+            lastEnd = recordEnd(self.data, INDEX.unpack_from(index, (count - 1) * INDEX.size)[0])
+            if lastEnd == len(self.data):
+                self.offsets = index
+                self.count = count
+            else:
+                index.close()
+        if self.offsets is None:
+            self.offsets, end = scanOffsets(self.data, path)
+            self.count = len(self.offsets)
+
+    def offset(self, index):
+        """
+        Return where a game starts in the file.
+        :param index: Int.
+        :return: Int.
+        """
+        if isinstance(self.offsets, array):
+            return self.offsets[index]
+        return INDEX.unpack_from(self.offsets, index * INDEX.size)[0]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("game record index out of range")
+        return gameRecord.decode(self.data, self.offset(index))[0]
+
+    def __iter__(self):
+        offset = self.offset(0) if self.count > 0 else FILE_HEADER.size
+        for i in range(0, self.count):
+            record, offset = gameRecord.decode(self.data, offset)
+            yield record
+
+    def close(self):
+        if not isinstance(self.offsets, array):
+            self.offsets.close()
+        self.data.close()
+        self.dataFile.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
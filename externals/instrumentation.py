@@ -0,0 +1,267 @@
+import functools
+import gc
+import json
+import os
+import sys
+import threading
+import time
+
+# (module attribute holding the class, method name, reported name)
+targets = [("knowledgeMap", "highestPriority", "knowledgeMap.highestPriority")]
+targets += [("knowledgeMap", method, "knowledgeMap." + method) for method in (
+    "sunkShip", "shipLocated", "horizontalShip", "verticalShip", "cardinalConfirmed", "horizontalChecked",
+    "verticalChecked", "cardinalChecked", "resetCardinalPriorities", "shipCheckHit")]
+targets += [("ship", "place", "ship.place"), ("ship", "_ship__chooseLocation", "ship.chooseLocation"),
+            ("ship", "validShipLocation", "ship.validShipLocation"), ("fleetPlacer", "place", "fleetPlacer.place"),
+            ("fleetPlacer", "placeRandom", "fleetPlacer.placeRandom"),
+            ("fleetPlacer", "placements", "fleetPlacer.placements"), ("tile", "attack", "tile.attack"),
+            ("map_", "attack", "map_.attack"), ("bitMap", "attack", "bitMap.attack")]
+
+enabled = False
+current = {}
+totals = {}
+games = 0
+originals = []
+collectionStarted = None
+blocksAtStart = 0
+
+
+def record(name, seconds, calls=1):
+    """
+    Count a call and its time in the current game.
+    :param name: String.
+    :param seconds: Float.
+    :param calls: Int, calls or other events counted.
+    """
+    entry = current.get(name)
+    if entry is None:
+        current[name] = [calls, seconds]
+    else:
+        entry[0] += calls
+        entry[1] += seconds
+
+
+def collectionCallback(phase, info):
+    """
+    Count each garbage collection by generation with its pause, and the objects it freed, registered in gc.callbacks.
+    :param phase: String, "start" or "stop".
+    :param info: Dict, from the gc module.
+    """
+    global collectionStarted
+    if phase == "start":
+        collectionStarted = time.perf_counter()
+    elif collectionStarted is not None:
+        record("gc.generation{}".format(info["generation"]), time.perf_counter() - collectionStarted)
+        record("gc.collected", 0.0, info["collected"])
+        collectionStarted = None
+
+
+def timed(name, function):
+    """
+    Return function wrapped to record its calls and inclusive time under name.
+    :param name: String.
+    :param function: Callable.
+    :return: Callable.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def timedUpdateKnowledge(function, hitCode):
+    """
+    Return AI.__updateKnowledge wrapped to record each branch, named by the priority attacked and the outcome.
+    :param function: Callable.
+    :param hitCode: Int, knowledge code of a hit.
+    :return: Callable.
+    """
+    @functools.wraps(function)
+    def wrapper(self, location, attackInfo, sunk):
+        if sunk:
+            outcome = "sunk"
+        else:
+            outcome = "hit" if self.knowledge.cells[location] == hitCode else "miss"
+        start = time.perf_counter()
+        try:
+            return function(self, location, attackInfo, sunk)
+        finally:
+            record("AI.updateKnowledge.{}.{}".format(attackInfo, outcome), time.perf_counter() - start)
+    return wrapper
+
+
+def enable(module=None):
+    """
+    Wrap every target method of the game module with counters and timers, and count garbage collections.
+    Nothing is wrapped until this is called, so instrumentation costs nothing while disabled.
+    :param module: Module, defaults to main.
+    """
+    global enabled
+    if enabled:
+        return
+    if module is None:
+        module = sys.modules.get("main") or sys.modules["__main__"]
+    for className, method, name in targets:
+        owner = getattr(module, className)
+        originals.append((owner, method, owner.__dict__[method]))
+        setattr(owner, method, timed(name, owner.__dict__[method]))
+    originals.append((module.AI, "_AI__updateKnowledge", module.AI.__dict__["_AI__updateKnowledge"]))
+    module.AI._AI__updateKnowledge = timedUpdateKnowledge(module.AI.__dict__["_AI__updateKnowledge"], module.HIT)
+    gc.callbacks.append(collectionCallback)
+    enabled = True
+
+
+def disable():
+    """Put every original method back."""
+    global enabled
+    while originals:
+        owner, method, function = originals.pop()
+        setattr(owner, method, function)
+    if collectionCallback in gc.callbacks:
+        gc.callbacks.remove(collectionCallback)
+    enabled = False
+
+
+def gameStarted():
+    """Start counting a new game."""
+    global blocksAtStart
+    current.clear()
+    blocksAtStart = sys.getallocatedblocks()
+
+
+def gameFinished():
+    """
+    Add the current game to the totals and return its counters.
+    memory.blocksKept counts the memory blocks the game left allocated, such as objects waiting for the cyclic gc.
+    :return: Dict, name to [calls, seconds].
+    """
+    record("memory.blocksKept", 0.0, sys.getallocatedblocks() - blocksAtStart)
+    # a collection while copying would add to current, even while its items are being listed
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        counters = {name: list(entry) for name, entry in current.items()}
+    finally:
+        if collecting:
+            gc.enable()
+    addGame(counters)
+    current.clear()
+    return counters
+
+
+def addGame(counters):
+    """
+    Add the counters of a game, such as one played in a worker process, to the totals.
+    :param counters: Dict, name to [calls, seconds].
+    """
+    global games
+    games += 1
+    for name, (calls, seconds) in counters.items():
+        entry = totals.setdefault(name, [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+
+
+def reset():
+    """Forget every game counted so far."""
+    global games
+    games = 0
+    totals.clear()
+    current.clear()
+
+
+def report():
+    """
+    Return the totals with per call and per game figures.
+    :return: Dict.
+    """
+    counters = {}
+    for name, (calls, seconds) in sorted(totals.items()):
+        counters[name] = {"calls": calls, "seconds": seconds,
+                          "meanMicroseconds": 1e6 * seconds / calls if calls > 0 else None,
+                          "callsPerGame": calls / games if games > 0 else None,
+                          "secondsPerGame": seconds / games if games > 0 else None}
+    return {"games": games, "counters": counters}
+
+
+def export(path):
+    """
+    Write report() as JSON.
+    :param path: String.
+    """
+    with open(path, "w") as reportFile:
+        json.dump(report(), reportFile, indent=2)
+
+
+class sampler(object):
+    """
+    Samples the stacks of the process's threads at a fixed interval and counts each distinct stack.
+    Each stack starts with the name of its thread, so threads get separate towers in a flame graph.
+    Export writes the collapsed stack format read by flamegraph.pl, speedscope and similar tools.
+    Only threads of this process are seen, games played in worker processes are not.
+    """
+
+    def __init__(self, interval=0.001, thread=None):
+        """
+        Create a stopped sampler.
+        :param interval: Float, seconds between samples.
+        :param thread: threading.Thread to sample, defaults to every thread but the sampler's own.
+        """
+        self.interval = interval
+        self.threadId = None if thread is None else thread.ident
+        self.stacks = {}
+        self.running = False
+        self.worker = None
+
+    def __sample(self):
+        """Count the sampled threads' stacks every interval until stopped."""
+        ownId = threading.get_ident()
+        while self.running:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for threadId, frame in sys._current_frames().items():
+                if threadId == ownId or (self.threadId is not None and threadId != self.threadId):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append("{}:{}".format(os.path.basename(code.co_filename), code.co_name))
+                    frame = frame.f_back
+                stack.append(names.get(threadId, "thread-{}".format(threadId)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            time.sleep(self.interval)
+
+    def start(self):
+        self.running = True
+        self.worker = threading.Thread(target=self.__sample, daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        self.running = False
+        self.worker.join()
+
+    def collapsed(self):
+        """
+        Return one line per distinct stack, thread name and outermost frame first, followed by its sample count.
+        :return: List of String.
+        """
+        return ["{} {}".format(stack, count) for stack, count in sorted(self.stacks.items())]
+
+    def export(self, path):
+        """
+        Write the collapsed stacks.
+        :param path: String.
+        """
+        with open(path, "w") as stackFile:
+            stackFile.write("\n".join(self.collapsed()) + "\n")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exception):
+        self.stop()
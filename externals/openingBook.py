@@ -0,0 +1,180 @@
+import json
+import os
+import random
+import threading
+
+VERSION = 2
+# the dihedral group of a square board, as flags: 4 transposes, 2 flips rows, 1 flips columns
+SYMMETRIES = range(0, 8)
+# where a book kept across runs usually lives, only used when a caller passes it as the path
+defaultPath = os.path.join(os.path.expanduser("~"), ".cache", "battleships", "openingBook.json")
+
+
+def transform(location, length, symmetry):
+    """
+    Return where a location goes under one of the 8 symmetries of the board.
+    :param location: Index.
+    :param length: Int, length of the map.
+    :param symmetry: Int, from SYMMETRIES.
+    :return: Index.
+    """
+    row, column = divmod(location, length)
+    if symmetry & 4:
+        row, column = column, row
+    if symmetry & 2:
+        row = length - 1 - row
+    if symmetry & 1:
+        column = length - 1 - column
+    return row * length + column
+
+
+def canonical(line, length):
+    """
+    Return the smallest of the 8 symmetric images of a line, so equivalent lines are stored once.
+    :param line: List of Index.
+    :param length: Int, length of the map.
+    :return: List of Index.
+    """
+    return min([transform(location, length, symmetry) for location in line] for symmetry in SYMMETRIES)
+
+
+def bookKey(scoring, length, lengths):
+    """
+    Return the key of the line for a scoring rule, board size and fleet.
+    :param scoring: String, names the scoring rule and its version, so lines scored another way are never played.
+    :param length: Int, length of the map.
+    :param lengths: Tuple of Int, ship lengths the line was scored with.
+    :return: String.
+    """
+    return "{}/{}:{}".format(scoring, length, ",".join(str(shipLength) for shipLength in sorted(lengths)))
+
+
+def buildLine(length, scores, depth):
+    """
+    Return the shots to fire while every shot so far has missed, each the best scoring tile given the misses before it.
+    :param length: Int, length of the map.
+    :param scores: Callable, taking the List of missed locations and returning a score for every tile.
+    :param depth: Int, most shots in the line.
+    :return: List of Index.
+    """
+    line = []
+    fired = set()
+    for i in range(0, min(depth, length ** 2)):
+        tileScores = scores(line)
+        best = None
+        for location in range(0, length ** 2):
+            if location not in fired and (best is None or tileScores[location] > tileScores[best]):
+                best = location
+        line.append(best)
+        fired.add(best)
+    return canonical(line, length)
+
+
+class openingBook(object):
+    """
+    Precomputed opening shots for each scoring rule, board size and fleet, built on first use.
+    A book with a path keeps its lines on disk, loaded on first use, a book without one only in memory.
+    Lines are stored once for all 8 symmetries of the board and played under a randomly chosen one.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path=None):
+        """
+        Create a book that reads nothing until a line is asked for.
+        :param path: String, file to keep the lines in, None to keep them in memory only.
+        """
+        self.path = path
+        self.lines = None
+        self.lock = threading.Lock()
+
+    def __read(self):
+        """
+        Return the lines saved on disk, nothing without a path or if the file is missing, unreadable or another version.
+        :return: Dict, key to List of Index.
+        """
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path) as bookFile:
+                saved = json.load(bookFile)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(saved, dict) or saved.get("version") != VERSION:
+            return {}
+        return saved.get("lines", {})
+
+    def load(self):
+        """Read the book from disk if it has not been read yet."""
+        with self.lock:
+            self.__load()
+
+    def __load(self):
+        """Read the book from disk if it has not been read yet, with the lock held."""
+        if self.lines is None:
+            self.lines = self.__read()
+
+    def save(self):
+        """
+        Write the book, keeping lines other processes saved meanwhile.
+        The file is replaced in one step so readers never see it half written.
+        Books without a path or that cannot be written stay in memory.
+        """
+        with self.lock:
+            self.__load()
+            self.__save()
+
+    def __save(self):
+        """Write the book, with the lock held."""
+        if self.path is None:
+            return
+        lines = self.__read()
+        lines.update(self.lines)
+        temporaryPath = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(temporaryPath, "w") as bookFile:
+                json.dump({"version": VERSION, "lines": lines}, bookFile)
+            os.replace(temporaryPath, self.path)
+        except OSError:
+            return
+        self.lines = lines
+
+    def line(self, scoring, length, lengths, scores, depth):
+        """
+        Return the stored line for a scoring rule, board size and fleet, building and saving it if it is missing or
+        too short. Lines are built with the lock held, so threads asking for the same line build it once.
+        :param scoring: String, see bookKey.
+        :param length: Int, length of the map.
+        :param lengths: Tuple of Int, ship lengths scored.
+        :param scores: Callable, see buildLine.
+        :param depth: Int, shots wanted.
+        :return: List of Index, in canonical orientation.
+        """
+        key = bookKey(scoring, length, lengths)
+        depth = min(depth, length ** 2)
+        with self.lock:
+            self.__load()
+            line = self.lines.get(key, [])
+            if len(line) < depth:
+                line = buildLine(length, scores, depth)
+                self.lines[key] = line
+                self.__save()
+        return line[:depth]
+
+    def play(self, scoring, length, lengths, scores, depth):
+        """
+        Return the line for a scoring rule, board size and fleet under a random symmetry.
+        :param scoring: String, see bookKey.
+        :param length: Int, length of the map.
+        :param lengths: Tuple of Int, ship lengths scored.
+        :param scores: Callable, see buildLine.
+        :param depth: Int, shots wanted.
+        :return: List of Index.
+        """
+        symmetry = random.choice(SYMMETRIES)
+        line = self.line(scoring, length, lengths, scores, depth)
+        return [transform(location, length, symmetry) for location in line]
+
+
+# book hardAI plays from, in memory only unless its path is set, for example to defaultPath
+shared = openingBook()
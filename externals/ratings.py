@@ -0,0 +1,52 @@
+class eloRatings(object):
+    """Elo ratings of players, updated one game at a time as results arrive."""
+
+    def __init__(self, initial=1500.0, k=16.0):
+        """
+        Create ratings where every new player starts at initial.
+        :param initial: Float.
+        :param k: Float, most a rating moves after one game.
+        """
+        self.initial = initial
+        self.k = k
+        self.ratings = {}
+        self.games = {}
+        self.wins = {}
+
+    def rating(self, name):
+        """
+        Return the rating of a player.
+        :param name: String.
+        :return: Float.
+        """
+        return self.ratings.get(name, self.initial)
+
+    def expected(self, name, opponent):
+        """
+        Return the chance of a player beating an opponent according to their ratings.
+        :param name: String.
+        :param opponent: String.
+        :return: Float.
+        """
+        return 1 / (1 + 10 ** ((self.rating(opponent) - self.rating(name)) / 400))
+
+    def update(self, winner, loser):
+        """
+        Move the ratings of both players after a game.
+        :param winner: String.
+        :param loser: String.
+        """
+        change = self.k * (1 - self.expected(winner, loser))
+        self.ratings[winner] = self.rating(winner) + change
+        self.ratings[loser] = self.rating(loser) - change
+        for name in (winner, loser):
+            self.games[name] = self.games.get(name, 0) + 1
+        self.wins[winner] = self.wins.get(winner, 0) + 1
+
+    def table(self):
+        """
+        Return the players best first.
+        :return: List of Tuple, (name, rating, games, wins).
+        """
+        return [(name, self.rating(name), self.games.get(name, 0), self.wins.get(name, 0))
+                for name in sorted(self.ratings, key=self.rating, reverse=True)]
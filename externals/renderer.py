@@ -0,0 +1,198 @@
+import shutil
+import sys
+
+HIDDEN_SHIP = "□"
+
+
+class viewport(object):
+    """Window of rows and columns of a map shown on screen, scrolled to follow play on boards too large to fit."""
+
+    def __init__(self, length, rows=None, columns=None):
+        """
+        Create a window in the top left corner of the map.
+        :param length: Int, length of the map.
+        :param rows: Int, rows shown, None for every row.
+        :param columns: Int, columns shown, None for every column.
+        """
+        self.length = length
+        self.rows = length if rows is None else max(1, min(rows, length))
+        self.columns = length if columns is None else max(1, min(columns, length))
+        self.top = 0
+        self.left = 0
+
+    @staticmethod
+    def forTerminal(length, mapsAcross=1, reservedLines=0):
+        """
+        Return the largest window that fits the terminal.
+        :param length: Int, length of the map.
+        :param mapsAcross: Int, maps drawn side by side.
+        :param reservedLines: Int, lines needed for anything else on screen.
+        :return: viewport.
+        """
+        terminalColumns, terminalLines = shutil.get_terminal_size()
+        labelWidth = len(str(length - 1))
+        columns = (terminalColumns - 2 * (mapsAcross - 1)) // mapsAcross - labelWidth
+        rows = terminalLines - reservedLines - labelWidth
+        return viewport(length, rows, columns)
+
+    def fits(self):
+        """
+        Return True if the whole map is shown.
+        :return: Bool.
+        """
+        return self.rows == self.length and self.columns == self.length
+
+    def scroll(self, rows, columns):
+        """
+        Move the window, keeping it on the map.
+        :param rows: Int, rows to move down, negative for up.
+        :param columns: Int, columns to move right, negative for left.
+        """
+        self.top = max(0, min(self.top + rows, self.length - self.rows))
+        self.left = max(0, min(self.left + columns, self.length - self.columns))
+
+    def follow(self, location):
+        """
+        Scroll as little as possible to show a location.
+        :param location: Index.
+        """
+        row, column = divmod(location, self.length)
+        if row < self.top:
+            self.scroll(row - self.top, 0)
+        elif row >= self.top + self.rows:
+            self.scroll(row - self.top - self.rows + 1, 0)
+        if column < self.left:
+            self.scroll(0, column - self.left)
+        elif column >= self.left + self.columns:
+            self.scroll(0, column - self.left - self.columns + 1)
+
+
+def mapLines(_map, shipVis, window=None):
+    """
+    Return the lines showing a map, or the part of it inside a window.
+    Columns are labelled by their number written downwards and rows by their number, so any size reads correctly.
+    :param _map: _Map class.
+    :param shipVis: Bool, whether to show unhit ships.
+    :param window: viewport, None for the whole map.
+    :return: List of String.
+    """
+    length = _map.length
+    if window is None:
+        window = viewport(length)
+    labelWidth = len(str(length - 1))
+    columns = range(window.left, window.left + window.columns)
+    labels = [str(column).rjust(labelWidth) for column in columns]
+    lines = [" " * labelWidth + "".join(label[digit] for label in labels) for digit in range(0, labelWidth)]
+    # built on every access, so taken once for the whole map
+    array = _map.array
+    for row in range(window.top, window.top + window.rows):
+        images = []
+        for column in columns:
+            location = array[row * length + column]
+            if (shipVis is False) and (location.entity == "ship"):
+                images.append(HIDDEN_SHIP)
+            else:
+                images.append(location.getImage())
+        lines.append(str(row).rjust(labelWidth) + "".join(images))
+    return lines
+
+
+def sideBySide(blocks, gap=2):
+    """
+    Return blocks of lines joined horizontally.
+    :param blocks: List of List of String.
+    :param gap: Int, spaces between blocks.
+    :return: List of String.
+    """
+    widths = [max(len(line) for line in block) for block in blocks]
+    lines = []
+    for row in range(0, max(len(block) for block in blocks)):
+        parts = [(block[row] if row < len(block) else "").ljust(width) for block, width in zip(blocks, widths)]
+        lines.append((" " * gap).join(parts).rstrip())
+    return lines
+
+
+class terminalRenderer(object):
+    """
+    Draws frames of text lines from the top of the terminal, each written with a single write.
+    Only the characters that changed since the previous frame are rewritten, reached with ANSI cursor moves.
+    """
+
+    # unchanged characters between two changes rewritten rather than jumped over, jumping costs about this much
+    jumpCost = 8
+
+    def __init__(self, output=None):
+        """
+        Create a renderer that knows nothing of the screen yet.
+        :param output: File, defaults to sys.stdout.
+        """
+        self.output = sys.stdout if output is None else output
+        self.frame = None
+        self.status = []
+
+    def invalidate(self):
+        """Forget the screen contents, used after anything else writes to the terminal."""
+        self.frame = None
+
+    def clear(self):
+        """Clear the terminal."""
+        self.output.write("\x1b[H\x1b[2J")
+        self.output.flush()
+        self.frame = []
+
+    @staticmethod
+    def move(row, column):
+        """
+        Return the escape code moving the cursor.
+        :param row: Int, from 0.
+        :param column: Int, from 0.
+        :return: String.
+        """
+        return "\x1b[{};{}H".format(row + 1, column + 1)
+
+    def changes(self, row, old, new):
+        """
+        Return the escape codes and text turning one line into another.
+        :param row: Int.
+        :param old: String.
+        :param new: String.
+        :return: List of String.
+        """
+        parts = []
+        start = None
+        end = None
+        for column in range(0, min(len(old), len(new))):
+            if old[column] == new[column]:
+                continue
+            if start is not None and column - end > self.jumpCost:
+                parts.append(self.move(row, start) + new[start:end])
+                start = None
+            if start is None:
+                start = column
+            end = column + 1
+        if len(new) != len(old):
+            if start is None:
+                start = min(len(old), len(new))
+            parts.append(self.move(row, start) + new[start:] + "\x1b[K")
+        elif start is not None:
+            parts.append(self.move(row, start) + new[start:end])
+        return parts
+
+    def draw(self, lines):
+        """
+        Draw a frame below the status lines, then clear anything left under it such as old prompts.
+        :param lines: List of String.
+        """
+        lines = self.status + lines
+        if self.frame is None:
+            parts = ["\x1b[H\x1b[2J"]
+            previous = []
+        else:
+            parts = []
+            previous = self.frame
+        for row, line in enumerate(lines):
+            parts += self.changes(row, previous[row] if row < len(previous) else "", line)
+        parts.append(self.move(len(lines), 0) + "\x1b[J")
+        self.output.write("".join(parts))
+        self.output.flush()
+        self.frame = lines
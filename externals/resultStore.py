@@ -0,0 +1,98 @@
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    mapSize INTEGER NOT NULL,
+    pairing TEXT NOT NULL,
+    gameIndex INTEGER NOT NULL,
+    playerOne TEXT NOT NULL,
+    playerTwo TEXT NOT NULL,
+    winner INTEGER NOT NULL,
+    shotsOne INTEGER NOT NULL,
+    shotsTwo INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    seed TEXT,
+    UNIQUE (mapSize, pairing, gameIndex)
+)
+"""
+
+
+def pairingKey(nameOne, nameTwo):
+    """
+    Return the key shared by every game between two classes, whichever sat first.
+    :param nameOne: String.
+    :param nameTwo: String.
+    :return: String.
+    """
+    return " v ".join(sorted((nameOne, nameTwo)))
+
+
+class resultStore(object):
+    """Game results of a league kept in a SQLite database, inserted in batches."""
+
+    def __init__(self, path, batchSize=256):
+        """
+        Open or create the database.
+        :param path: String, ":memory:" for a database that is not saved.
+        :param batchSize: Int, results buffered before they are inserted in one transaction.
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+        self.batchSize = batchSize
+        self.pending = []
+
+    def playedIndices(self, mapSize, nameOne, nameTwo):
+        """
+        Return the game indices already stored for a pairing.
+        :param mapSize: Int.
+        :param nameOne: String.
+        :param nameTwo: String.
+        :return: Set of Int.
+        """
+        rows = self.connection.execute("SELECT gameIndex FROM games WHERE mapSize = ? AND pairing = ?",
+                                       (mapSize, pairingKey(nameOne, nameTwo)))
+        return {gameIndex for (gameIndex,) in rows}
+
+    def games(self, mapSize):
+        """
+        Yield every stored game of a map size in the order it was stored.
+        :param mapSize: Int.
+        :return: Generator of Tuple, (playerOne, playerTwo, winner).
+        """
+        yield from self.connection.execute(
+            "SELECT playerOne, playerTwo, winner FROM games WHERE mapSize = ? ORDER BY id", (mapSize,))
+
+    def add(self, mapSize, gameIndex, playerOne, playerTwo, result):
+        """
+        Buffer a game, inserting the buffer once it holds batchSize games.
+        :param mapSize: Int.
+        :param gameIndex: Int, index of the game within its pairing.
+        :param playerOne: String, class name of player one.
+        :param playerTwo: String, class name of player two.
+        :param result: gameResult.
+        """
+        seed = None if result.seed is None else str(result.seed)
+        self.pending.append((mapSize, pairingKey(playerOne, playerTwo), gameIndex, playerOne, playerTwo,
+                             result.winnerIndex, result.shots[0], result.shots[1], result.turns, seed))
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        """Insert every buffered game in one transaction, ignoring games stored already."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO games (mapSize, pairing, gameIndex, playerOne, playerTwo, winner, shotsOne, "
+                "shotsTwo, turns, seed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
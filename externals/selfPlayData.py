@@ -0,0 +1,261 @@
+import os
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SHARD_NAME = "shard-{:06d}.npy"
+# rows of the shard being filled, saved by shardWriter.checkpoint
+PENDING_NAME = "pending-{:06d}.npy"
+
+
+def sampleType(mapSize):
+    """
+    Return the numpy record type of one shot for a map size.
+    board holds the shooter's knowledgeMap codes before the shot, shotsToFinish counts the shooter's shots
+    from this one to the end of the game, and won is 1 if the shooter won.
+    :param mapSize: Int.
+    :return: numpy.dtype.
+    """
+    return numpy.dtype([("board", numpy.uint8, (mapSize ** 2,)), ("cell", "<u4"), ("player", numpy.uint8),
+                        ("hit", numpy.uint8), ("shotsToFinish", "<u4"), ("won", numpy.uint8)])
+
+
+class gameSamples(object):
+    """Every shot of one game with the shooter's knowledge before it, collected without numpy while the game runs."""
+
+    def __init__(self, mapSize):
+        """
+        Create an empty collection.
+        :param mapSize: Int.
+        """
+        self.mapSize = mapSize
+        self.boards = bytearray()
+        self.cells = array("I")
+        self.players = array("B")
+        self.hits = array("B")
+        self.shotsToFinish = array("I")
+        self.winner = None
+
+    def __len__(self):
+        return len(self.cells)
+
+    def add(self, cells, cell, player, hit):
+        """
+        Add a shot.
+        :param cells: Bytes, the shooter's knowledgeMap cells before the shot.
+        :param cell: Index, tile fired at.
+        :param player: Int, 0 for player one, 1 for player two.
+        :param hit: Bool.
+        """
+        self.boards += cells
+        self.cells.append(cell)
+        self.players.append(player)
+        self.hits.append(hit)
+
+    def finish(self, shots, winner):
+        """
+        Fill in shotsToFinish once the game is over.
+        :param shots: Tuple, shots fired by player one and player two.
+        :param winner: Int.
+        """
+        fired = [0, 0]
+        for player in self.players:
+            self.shotsToFinish.append(shots[player] - fired[player])
+            fired[player] += 1
+        self.winner = winner
+
+
+class shardWriter(object):
+    """
+    Streams shots into .npy shards of at most shardBytes each, so memory use and file size are bounded.
+    Shards are written to a temporary name and renamed, so readers only ever see complete shards.
+    A checkpoint saves the rows of the shard being filled beside the shards instead of writing a short shard.
+    """
+
+    def __init__(self, directory, mapSize, shardBytes=1 << 23, resume=None):
+        """
+        Create the directory if needed and continue numbering after any shards already in it.
+        :param directory: String.
+        :param mapSize: Int, every shot written must come from this map size.
+        :param shardBytes: Int, bytes of rows per shard, at least one row is always kept.
+        :param resume: Tuple, (shards, rows) returned by checkpoint(), to continue from that checkpoint,
+        deleting anything written after it. None to continue after every shard in the directory.
+        """
+        if numpy is None:
+            raise ImportError("numpy is needed to write self play shards")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.mapSize = mapSize
+        rowType = sampleType(mapSize)
+        # rows per shard, as the size of a row grows with the square of the map size
+        self.shardSize = max(1, shardBytes // rowType.itemsize)
+        self.buffer = numpy.zeros(self.shardSize, dtype=rowType)
+        self.rows = 0
+        if resume is not None:
+            self.shard, self.rows = resume
+            if self.rows > 0:
+                # rows only ever grow within a shard, so whichever copy is on disk starts with the checkpointed ones
+                path = self.path(SHARD_NAME)
+                if not os.path.exists(path):
+                    path = self.path(PENDING_NAME)
+                self.buffer[:self.rows] = numpy.load(path)[:self.rows]
+            for path in shardPaths(directory)[self.shard:]:
+                os.remove(path)
+        else:
+            self.shard = len(shardPaths(directory))
+        self.removePending()
+
+    def path(self, name):
+        """
+        Return the path of the shard being filled, or of its pending rows.
+        :param name: String, SHARD_NAME or PENDING_NAME.
+        :return: String.
+        """
+        return os.path.join(self.directory, name.format(self.shard))
+
+    def removePending(self):
+        """Delete the pending rows of every shard but the one being filled."""
+        keep = PENDING_NAME.format(self.shard)
+        for name in os.listdir(self.directory):
+            if name.startswith("pending-") and name.endswith(".npy") and name != keep:
+                os.remove(os.path.join(self.directory, name))
+
+    def write(self, samples):
+        """
+        Add every shot of a game, writing shards as they fill up.
+        :param samples: gameSamples.
+        """
+        if samples.mapSize != self.mapSize:
+            raise ValueError("shards hold {0}x{0} boards, not {1}x{1}".format(self.mapSize, samples.mapSize))
+        boards = numpy.frombuffer(samples.boards, dtype=numpy.uint8).reshape(len(samples), -1)
+        players = numpy.frombuffer(samples.players, dtype=numpy.uint8)
+        columns = {"board": boards, "cell": numpy.frombuffer(samples.cells, dtype=numpy.uint32), "player": players,
+                   "hit": numpy.frombuffer(samples.hits, dtype=numpy.uint8),
+                   "shotsToFinish": numpy.frombuffer(samples.shotsToFinish, dtype=numpy.uint32),
+                   "won": (players == samples.winner).astype(numpy.uint8)}
+        start = 0
+        while start < len(samples):
+            count = min(len(samples) - start, self.shardSize - self.rows)
+            for name, column in columns.items():
+                self.buffer[name][self.rows:self.rows + count] = column[start:start + count]
+            self.rows += count
+            start += count
+            if self.rows == self.shardSize:
+                self.flush()
+
+    def save(self, path):
+        """
+        Write the buffered rows to path in one step.
+        :param path: String.
+        """
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath, "wb") as shardFile:
+            numpy.save(shardFile, self.buffer[:self.rows])
+        os.replace(temporaryPath, path)
+
+    def flush(self):
+        """Write the buffered rows as a shard, which is smaller than shardSize only if called early."""
+        if self.rows == 0:
+            return
+        self.save(self.path(SHARD_NAME))
+        self.shard += 1
+        self.rows = 0
+        self.removePending()
+
+    def checkpoint(self):
+        """
+        Save the buffered rows as the pending rows of the shard being filled, leaving them buffered.
+        Costs rewriting at most one shard's rows, however often it is called.
+        :return: Tuple, (shards, rows), to pass as resume.
+        """
+        if self.rows > 0:
+            self.save(self.path(PENDING_NAME))
+        return self.shard, self.rows
+
+    def close(self):
+        self.flush()
+        self.removePending()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def shardPaths(directory):
+    """
+    Return the complete shards in a directory, in the order they were written.
+    :param directory: String.
+    :return: List of String.
+    """
+    names = sorted(name for name in os.listdir(directory) if name.startswith("shard-") and name.endswith(".npy"))
+    return [os.path.join(directory, name) for name in names]
+
+
+class shardReader(object):
+    """Memory maps every shard of a directory, giving random access to shots and random batches of them."""
+
+    def __init__(self, directory):
+        """
+        Map every shard, reading nothing but their headers.
+        :param directory: String.
+        """
+        if numpy is None:
+            raise ImportError("numpy is needed to read self play shards")
+        self.shards = [numpy.load(path, mmap_mode="r") for path in shardPaths(directory)]
+        if len({shard.dtype for shard in self.shards}) > 1:
+            raise ValueError("{} holds shards of different map sizes or formats".format(directory))
+        self.ends = numpy.cumsum([len(shard) for shard in self.shards], dtype=numpy.int64)
+
+    def __len__(self):
+        return int(self.ends[-1]) if len(self.shards) > 0 else 0
+
+    def __locate(self, indices):
+        """
+        Return the shard holding each row and the row's index inside it.
+        :param indices: numpy.ndarray.
+        :return: Tuple of numpy.ndarray.
+        """
+        shards = numpy.searchsorted(self.ends, indices, side="right")
+        starts = numpy.concatenate(([0], self.ends[:-1]))
+        return shards, indices - starts[shards]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("shot index out of range")
+        shards, rows = self.__locate(numpy.array([index]))
+        return self.shards[shards[0]][rows[0]]
+
+    def batch(self, indices):
+        """
+        Return the rows at indices, read shard by shard.
+        :param indices: Sequence of Int.
+        :return: numpy.ndarray of records, in the order of indices.
+        """
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        shards, rows = self.__locate(indices)
+        result = numpy.empty(len(indices), dtype=self.shards[0].dtype)
+        for shard in numpy.unique(shards):
+            chosen = shards == shard
+            result[chosen] = self.shards[shard][rows[chosen]]
+        return result
+
+    def batches(self, batchSize, shuffle=True, seed=None):
+        """
+        Yield batches covering every row once.
+        :param batchSize: Int.
+        :param shuffle: Bool, random order rather than file order.
+        :param seed: Int, seed of the shuffle.
+        :return: Generator of numpy.ndarray of records.
+        """
+        order = numpy.arange(0, len(self))
+        if shuffle:
+            numpy.random.default_rng(seed).shuffle(order)
+        for start in range(0, len(order), batchSize):
+            yield self.batch(order[start:start + batchSize])
@@ -0,0 +1,250 @@
+import math
+from statistics import NormalDist
+
+
+class runningStat(object):
+    """Mean, variance and range of a stream of values in constant memory, using Welford's method."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.squares = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        """
+        Add a value to the stream.
+        :param value: Float.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.squares += delta * (value - self.mean)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def variance(self):
+        """
+        Return the sample variance.
+        :return: Float.
+        """
+        return self.squares / (self.count - 1) if self.count > 1 else 0.0
+
+    def meanInterval(self, z):
+        """
+        Return the normal approximation confidence interval of the mean.
+        :param z: Float, standard normal quantile of the confidence.
+        :return: Tuple of Float.
+        """
+        error = z * math.sqrt(self.variance() / self.count) if self.count > 0 else 0.0
+        return self.mean - error, self.mean + error
+
+    def state(self):
+        """
+        Return everything needed to continue the stream later, as json can encode it.
+        :return: Dict.
+        """
+        return dict(vars(self))
+
+    def restore(self, saved):
+        """
+        Continue from a state() saved earlier.
+        :param saved: Dict.
+        """
+        self.__dict__.update(saved)
+
+
+class histogram(object):
+    """Counts of each distinct integer value, bounded by the number of values that can occur rather than games."""
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+
+    def add(self, value):
+        """
+        Count a value.
+        :param value: Int.
+        """
+        self.counts[value] = self.counts.get(value, 0) + 1
+        self.total += 1
+
+    def percentile(self, fraction):
+        """
+        Return the smallest value with at least fraction of the counts at or below it.
+        :param fraction: Float, between 0 and 1.
+        :return: Int, None if nothing was counted.
+        """
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= fraction * self.total:
+                return value
+        return None
+
+    def state(self):
+        """
+        Return the counts as json can encode them, which only has string keys.
+        :return: Dict.
+        """
+        return {"counts": sorted(self.counts.items()), "total": self.total}
+
+    def restore(self, saved):
+        """
+        Continue from a state() saved earlier.
+        :param saved: Dict.
+        """
+        self.counts = {value: count for value, count in saved["counts"]}
+        self.total = saved["total"]
+
+
+def wilsonInterval(successes, trials, z):
+    """
+    Return the Wilson score interval of a win rate.
+    :param successes: Int.
+    :param trials: Int.
+    :param z: Float, standard normal quantile of the confidence.
+    :return: Tuple of Float.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    centre = (rate + z ** 2 / (2 * trials)) / (1 + z ** 2 / trials)
+    error = z * math.sqrt(rate * (1 - rate) / trials + z ** 2 / (4 * trials ** 2)) / (1 + z ** 2 / trials)
+    return centre - error, centre + error
+
+
+class tournamentStats(object):
+    """
+    Running win rates, shots to win and confidence intervals of a two player tournament.
+    With sequential set, a sequential probability ratio test for each player decides when one is better,
+    or when neither wins more than half the games by margin.
+    """
+
+    def __init__(self, names, confidence=0.95, sequential=False, margin=0.05):
+        """
+        Create empty statistics.
+        :param names: Tuple of String, names of player one and player two.
+        :param confidence: Float, confidence of intervals and of the sequential test.
+        :param sequential: Bool, stop once one player is better with the chosen confidence.
+        :param margin: Float, win rate above 0.5 counted as better.
+        """
+        self.names = names
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.sequential = sequential
+        self.margin = margin
+        self.games = 0
+        self.wins = [0, 0]
+        self.shotsToWin = (runningStat(), runningStat())
+        self.shotHistograms = (histogram(), histogram())
+        self.turns = runningStat()
+        self.decision = None
+        self.even = False
+        # one sided tests of each player winning with 0.5 + margin against 0.5
+        self.logRatios = [0.0, 0.0]
+        self.winStep = math.log((0.5 + margin) / 0.5)
+        self.lossStep = math.log((0.5 - margin) / 0.5)
+        # the chance of wrongly calling a player better is split between the two tests
+        falsePositive = (1 - confidence) / 2
+        falseNegative = 1 - confidence
+        self.upperBound = math.log((1 - falseNegative) / falsePositive)
+        self.lowerBound = math.log(falseNegative / (1 - falsePositive))
+
+    def add(self, winnerIndex, shots, turns):
+        """
+        Add the outcome of a game.
+        :param winnerIndex: Int, 0 if player one won, 1 if player two won.
+        :param shots: Tuple, shots fired by player one and player two.
+        :param turns: Int, number of volleys played.
+        """
+        self.games += 1
+        self.wins[winnerIndex] += 1
+        self.shotsToWin[winnerIndex].add(shots[winnerIndex])
+        self.shotHistograms[winnerIndex].add(shots[winnerIndex])
+        self.turns.add(turns)
+        if self.sequential and not self.stopped():
+            for player in (0, 1):
+                self.logRatios[player] += self.winStep if winnerIndex == player else self.lossStep
+                if self.logRatios[player] >= self.upperBound:
+                    self.decision = player
+            if self.decision is None and max(self.logRatios) <= self.lowerBound:
+                self.even = True
+
+    def state(self):
+        """
+        Return the games counted so far and the sequential test's progress, as json can encode them.
+        The settings they were counted with are included for reference, restore() keeps the constructor's.
+        :return: Dict.
+        """
+        return {"names": list(self.names), "confidence": self.confidence, "sequential": self.sequential,
+                "margin": self.margin, "games": self.games, "wins": list(self.wins),
+                "shotsToWin": [stat.state() for stat in self.shotsToWin],
+                "shotHistograms": [counts.state() for counts in self.shotHistograms], "turns": self.turns.state(),
+                "decision": self.decision, "even": self.even, "logRatios": list(self.logRatios)}
+
+    def restore(self, saved):
+        """
+        Continue from a state() saved earlier, such as the one in a tournament checkpoint.
+        :param saved: Dict.
+        """
+        self.games = saved["games"]
+        self.wins = list(saved["wins"])
+        for items, savedItems in ((self.shotsToWin, saved["shotsToWin"]),
+                                  (self.shotHistograms, saved["shotHistograms"])):
+            for item, savedItem in zip(items, savedItems):
+                item.restore(savedItem)
+        self.turns.restore(saved["turns"])
+        self.decision = saved["decision"]
+        self.even = saved["even"]
+        self.logRatios = list(saved["logRatios"])
+
+    def addResult(self, result):
+        """
+        Add a gameResult.
+        :param result: gameResult.
+        """
+        self.add(result.winnerIndex, result.shots, result.turns)
+
+    def stopped(self):
+        """
+        Return True once the sequential test has decided, either for one player or that neither is better.
+        :return: Bool.
+        """
+        return self.decision is not None or self.even
+
+    def winRate(self, player):
+        """
+        Return the win rate of a player and its Wilson interval.
+        :param player: Int, 0 or 1.
+        :return: Tuple, (Float, (Float, Float)).
+        """
+        rate = self.wins[player] / self.games if self.games > 0 else 0.0
+        return rate, wilsonInterval(self.wins[player], self.games, self.z)
+
+    def summary(self):
+        """
+        Return a printable summary.
+        :return: String.
+        """
+        lines = ["Games played : {}".format(self.games)]
+        for player, name in enumerate(self.names):
+            rate, (low, high) = self.winRate(player)
+            lines.append("{} : {} wins, win rate {:.3f} ({:.0%} interval {:.3f} - {:.3f})".format(
+                name, self.wins[player], rate, self.confidence, low, high))
+            shots = self.shotsToWin[player]
+            if shots.count > 0:
+                lines.append("    shots to win : mean {:.1f}, median {}, p90 {}, range {} - {}".format(
+                    shots.mean, self.shotHistograms[player].percentile(0.5),
+                    self.shotHistograms[player].percentile(0.9), shots.minimum, shots.maximum))
+        lines.append("Mean turns : {:.1f}".format(self.turns.mean))
+        if self.decision is not None:
+            lines.append("Stopped early, {} is better with {:.0%} confidence".format(
+                self.names[self.decision], self.confidence))
+        elif self.even:
+            lines.append("Stopped early, neither is better by {:.0%} with {:.0%} confidence".format(
+                self.margin, self.confidence))
+        elif self.sequential:
+            lines.append("No decision at {:.0%} confidence".format(self.confidence))
+        return "\n".join(lines)
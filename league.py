@@ -0,0 +1,160 @@
+"""
+Round robin league between every AI class, with Elo ratings and results kept in a SQLite database.
+
+Every pairing plays the same number of games, alternating which class sits first. Games already in the
+database are not replayed, so adding a class to the league only plays the pairings it is part of.
+Games of the slowest pairings are scheduled first so the pool is not left waiting on them at the end.
+"""
+import argparse
+import multiprocessing
+import time
+from os import cpu_count
+
+import main
+import externals.openingBook
+import externals.ratings
+import externals.resultStore
+
+
+def aiClasses():
+    """
+    Return every subclass of AI, at any depth, sorted by name.
+    :return: List of Class.
+    """
+    classes = []
+    pending = [main.AI]
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            if subclass not in classes:
+                classes.append(subclass)
+                pending.append(subclass)
+    return sorted(classes, key=lambda aiClass: aiClass.__name__)
+
+
+def shotCost(aiClass, mapSize, shots=10):
+    """
+    Return the mean seconds an AI class takes to set up and fire a shot, used to schedule slow pairings first.
+    :param aiClass: Class.
+    :param mapSize: Int.
+    :param shots: Int, shots timed.
+    :return: Float.
+    """
+    start = time.perf_counter()
+    attacker = aiClass(mapSize)
+    attacker.targetMap = main.mediumAI(mapSize).map
+    for i in range(0, min(shots, mapSize ** 2)):
+        if not attacker.targetMap.hasShips():
+            break
+        attacker.attack()
+    return (time.perf_counter() - start) / shots
+
+
+def schedule(classes, mapSize, games, store, seed):
+    """
+    Return the games still to play, those of the slowest pairings first.
+    :param classes: List of Class.
+    :param mapSize: Int.
+    :param games: Int, games each pairing should have.
+    :param store: resultStore.
+    :param seed: Int, league seed each game seed is derived from.
+    :return: List of Tuple, (classOne, classTwo, mapSize, seed, gameIndex).
+    """
+    costs = {aiClass: shotCost(aiClass, mapSize) for aiClass in classes}
+    pairings = [(first, second) for index, first in enumerate(classes) for second in classes[index + 1:]]
+    pairings.sort(key=lambda pairing: costs[pairing[0]] + costs[pairing[1]], reverse=True)
+    tasks = []
+    for first, second in pairings:
+        played = store.playedIndices(mapSize, first.__name__, second.__name__)
+        for gameIndex in range(0, games):
+            if gameIndex in played:
+                continue
+            gameSeed = main.deriveSeed(seed, "{}:{}".format(externals.resultStore.pairingKey(
+                first.__name__, second.__name__), gameIndex))
+            # alternate seats so neither class always moves first
+            classOne, classTwo = (first, second) if gameIndex % 2 == 0 else (second, first)
+            tasks.append((classOne, classTwo, mapSize, gameSeed, gameIndex))
+    return tasks
+
+
+def playLeagueGame(task):
+    """
+    Play one league game inside a worker process.
+    :param task: Tuple, (classOne, classTwo, mapSize, seed, gameIndex).
+    :return: Tuple, (task, gameResult).
+    """
+    classOne, classTwo, mapSize, seed, gameIndex = task
+    return task, main.playGame(classOne, classTwo, mapSize, seed)
+
+
+def league(classes, mapSize, games, store, ratings, seed=0, workers=None, progress=None):
+    """
+    Play every pairing of classes up to games games, storing each result and updating ratings as it arrives.
+    Ratings are first brought up to date with the games already stored.
+    :param classes: List of Class.
+    :param mapSize: Int.
+    :param games: Int, games each pairing should have.
+    :param store: resultStore.
+    :param ratings: eloRatings.
+    :param seed: Int, league seed.
+    :param workers: Int, number of processes, defaults to the number of cores.
+    :param progress: Callable, called with the games played and the games scheduled after every game.
+    :return: Int, games played.
+    """
+    for playerOne, playerTwo, winner in store.games(mapSize):
+        ratings.update(*((playerOne, playerTwo) if winner == 0 else (playerTwo, playerOne)))
+    tasks = schedule(classes, mapSize, games, store, seed)
+    if workers is None:
+        workers = cpu_count() or 1
+    pool = multiprocessing.Pool(workers) if workers > 1 and len(tasks) > 1 else None
+    played = 0
+    try:
+        results = map(playLeagueGame, tasks) if pool is None else pool.imap_unordered(playLeagueGame, tasks)
+        for (classOne, classTwo, mapSize, gameSeed, gameIndex), result in results:
+            names = (classOne.__name__, classTwo.__name__)
+            store.add(mapSize, gameIndex, names[0], names[1], result)
+            ratings.update(names[result.winnerIndex], names[1 - result.winnerIndex])
+            played += 1
+            if progress is not None:
+                progress(played, len(tasks))
+    finally:
+        if pool is not None:
+            pool.terminate()
+        store.flush()
+    return played
+
+
+def run():
+    """Parse arguments, play the league and print the ratings."""
+    classes = {aiClass.__name__: aiClass for aiClass in aiClasses()}
+    parser = argparse.ArgumentParser(description="Play a round robin league between AI classes.")
+    parser.add_argument("classes", nargs="*", help="classes in the league, every AI class if none are given")
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--games", type=int, default=100, help="games each pairing should have")
+    parser.add_argument("--database", default="league.sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--opening-book", dest="openingBook",
+                        help="file to keep hardAI's opening lines in across runs, in memory only if not given")
+    arguments = parser.parse_args()
+    for name in arguments.classes:
+        if name not in classes:
+            parser.error("{} is not an AI class, choose from {}".format(name, ", ".join(sorted(classes))))
+
+    leagueClasses = [classes[name] for name in arguments.classes] or list(classes.values())
+    externals.openingBook.shared.path = arguments.openingBook
+    ratings = externals.ratings.eloRatings()
+
+    def progress(played, scheduled):
+        print("\rGames played : {} / {}".format(played, scheduled), end="", flush=True)
+
+    start = time.perf_counter()
+    with externals.resultStore.resultStore(arguments.database) as store:
+        played = league(leagueClasses, arguments.size, arguments.games, store, ratings, arguments.seed,
+                        arguments.workers, progress)
+    print("\rGames played : {} in {:.1f}s".format(played, time.perf_counter() - start))
+    for name, rating, games, wins in ratings.table():
+        print("{:<16} {:7.1f}  {} wins of {}".format(name, rating, wins, games))
+
+
+if __name__ == "__main__":
+    run()
@@ -1,8 +1,39 @@
 import time
+import atexit
 import random
+import hashlib
+from array import array
+import multiprocessing
+import concurrent.futures
+from os import cpu_count, remove
 from sys import modules
+from collections import Counter, OrderedDict
 
 import externals.robotNames
+import externals.gameRecords
+import externals.tournamentStats
+import externals.renderer
+import externals.instrumentation
+import externals.openingBook
+import externals.decisionCache
+import externals.fleetSampling
+import externals.selfPlayData
+import externals.checkpoint
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# state codes held in map_.cells
+EMPTY, SHIP, DESTROYED_SHIP, TARGETED = range(0, 4)
+# state codes held in knowledgeMap.cells
+POSSIBLE, HIT, COMPLETED_SHIP, IMPOSSIBLE, CARDINAL_CHECK, LIKELY_CARDINAL, SHIP_CHECK = range(0, 7)
+# codes hashed into knowledgeMap.hash for a missed shot and for any shot, which knowledge can later overwrite
+MISSED, FIRED = range(7, 9)
+
+# terminal the interactive game draws on
+screen = externals.renderer.terminalRenderer()
 
 
 class FunctionFailedError(Exception):
@@ -13,54 +44,432 @@ class FunctionFailedError(Exception):
         Exception.__init__(self, "Unspecified Error Occurred In {}".format(function))
 
 
+class FleetPlacementError(Exception):
+    """Exception for a fleet that cannot fit onto a map."""
+
+    def __init__(self, length, remaining):
+        self.length = length
+        self.remaining = remaining
+        Exception.__init__(self, "No room left for a ship of length {}, fleet still to place: {}".format(
+            length, remaining))
+
+
+class bucket(object):
+    """Set of locations below a capacity supporting constant time random choice, stored in flat int arrays."""
+
+    def __init__(self, capacity, locations=()):
+        """
+        Create bucket holding the locations given.
+        :param capacity: Int, every location must be lower.
+        :param locations: Iterable of Index.
+        """
+        self.items = array("i")
+        self.positions = array("i", [-1]) * capacity
+        for location in locations:
+            self.add(location)
+
+    @staticmethod
+    def full(capacity):
+        """
+        Return a bucket holding every location below capacity.
+        :param capacity: Int.
+        :return: bucket.
+        """
+        newBucket = bucket(0)
+        newBucket.items = array("i", range(0, capacity))
+        newBucket.positions = array("i", range(0, capacity))
+        return newBucket
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, location):
+        return self.positions[location] >= 0
+
+    def add(self, location):
+        """
+        Add location if not already held.
+        :param location: Index.
+        """
+        if self.positions[location] < 0:
+            self.positions[location] = len(self.items)
+            self.items.append(location)
+
+    def discard(self, location):
+        """
+        Remove location if held, moving the last location into its slot.
+        :param location: Index.
+        """
+        index = self.positions[location]
+        if index < 0:
+            return
+        self.positions[location] = -1
+        last = self.items.pop()
+        if index < len(self.items):
+            self.items[index] = last
+            self.positions[last] = index
+
+    def clear(self):
+        """Remove every location, in time proportional to the locations held."""
+        for location in self.items:
+            self.positions[location] = -1
+        del self.items[:]
+
+    def fill(self):
+        """Hold every location below capacity, in the same order as bucket.full."""
+        self.items[:] = array("i", range(0, len(self.positions)))
+        self.positions[:] = self.items
+
+    def choice(self):
+        """
+        Return a random location, raising IndexError if empty.
+        :return: Index.
+        """
+        return random.choice(self.items)
+
+
+class tileArray(object):
+    """
+    Sequence of tile views onto a map's cells, created when indexed.
+    Maps create one on every access rather than keeping it, so a map and its views never form a reference cycle.
+    """
+
+    def __init__(self, _map, tileClass):
+        """
+        Save map and the class of view to create.
+        :param _map: _Map class
+        :param tileClass: Class, tile or a subclass.
+        """
+        self.map = _map
+        self.tileClass = tileClass
+
+    def __len__(self):
+        return self.map.length ** 2
+
+    def __getitem__(self, location):
+        if location < 0:
+            location += len(self)
+        if not 0 <= location < len(self):
+            raise IndexError("tile index out of range")
+        return self.tileClass(self.map, location)
+
+    def __iter__(self):
+        for location in range(0, len(self)):
+            yield self.tileClass(self.map, location)
+
+
+class sparseCells(object):
+    """Cells of a sparse board, a hash map holding only locations whose state code is not the default."""
+
+    def __init__(self, size, default):
+        """
+        Create cells that all hold the default code.
+        :param size: Int, number of locations.
+        :param default: Int, code of every location not stored.
+        """
+        self.size = size
+        self.default = default
+        self.codes = {}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, location):
+        return self.codes.get(location, self.default)
+
+    def __setitem__(self, location, code):
+        if code == self.default:
+            self.codes.pop(location, None)
+        else:
+            self.codes[location] = code
+
+
+class sparseBucket(bucket):
+    """Bucket for very large maps, keeping positions in a dict instead of an array as long as the map."""
+
+    def __init__(self, locations=()):
+        """
+        Create bucket holding the locations given.
+        :param locations: Iterable of Index.
+        """
+        self.items = array("q")
+        self.positions = {}
+        for location in locations:
+            self.add(location)
+
+    def __contains__(self, location):
+        return location in self.positions
+
+    def add(self, location):
+        """
+        Add location if not already held.
+        :param location: Index.
+        """
+        if location not in self.positions:
+            self.positions[location] = len(self.items)
+            self.items.append(location)
+
+    def discard(self, location):
+        """
+        Remove location if held, moving the last location into its slot.
+        :param location: Index.
+        """
+        index = self.positions.pop(location, None)
+        if index is None:
+            return
+        last = self.items.pop()
+        if index < len(self.items):
+            self.items[index] = last
+            self.positions[last] = index
+
+    def clear(self):
+        """Remove every location."""
+        self.positions.clear()
+        del self.items[:]
+
+
+class impliedBucket(object):
+    """
+    Bucket of every location still holding the default code of sparseCells, never stored while it is large.
+    Random choice samples locations until one holds the default, once that keeps failing the few locations left
+    are collected into a sparseBucket kept up to date from then on.
+    """
+
+    attempts = 64
+
+    def __init__(self, cells):
+        """
+        Create bucket implied by cells.
+        :param cells: sparseCells.
+        """
+        self.cells = cells
+        self.materialized = None
+
+    def __len__(self):
+        if self.materialized is not None:
+            return len(self.materialized)
+        return self.cells.size - len(self.cells.codes)
+
+    def __iter__(self):
+        if self.materialized is not None:
+            return iter(self.materialized)
+        return (location for location in range(0, self.cells.size) if location not in self.cells.codes)
+
+    def __contains__(self, location):
+        return self.cells[location] == self.cells.default
+
+    def add(self, location):
+        """
+        Note location holding the default code again, it already counts as held.
+        :param location: Index.
+        """
+        if self.materialized is not None:
+            self.materialized.add(location)
+
+    def discard(self, location):
+        """
+        Note location about to leave the default code.
+        :param location: Index.
+        """
+        if self.materialized is not None:
+            self.materialized.discard(location)
+
+    def clear(self):
+        """Go back to implying the locations from the cells, for when they are cleared."""
+        self.materialized = None
+
+    def choice(self):
+        """
+        Return a random location, raising IndexError if empty.
+        :return: Index.
+        """
+        if self.materialized is None:
+            if len(self) == 0:
+                raise IndexError("choice from an empty bucket")
+            for i in range(0, self.attempts):
+                location = random.randrange(0, self.cells.size)
+                if location not in self.cells.codes:
+                    return location
+            self.materialized = sparseBucket(iter(self))
+        return self.materialized.choice()
+
+
+class computedTable(object):
+    """Read only sequence computing each entry when indexed, standing in for a precomputed list."""
+
+    def __init__(self, function, size):
+        """
+        Save the function computing entries.
+        :param function: Callable, takes a location.
+        :param size: Int.
+        """
+        self.function = function
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, location):
+        return self.function(location)
+
+
+class topology(object):
+    """Precomputed coordinates and neighbours for every location of a map length, shared between maps."""
+
+    cache = {}
+
+    def __init__(self, length):
+        """
+        Build row, column and neighbour tables.
+        :param length: Int, length of the map.
+        """
+        self.length = length
+        self.size = length ** 2
+        self.rows = [location // length for location in range(0, self.size)]
+        self.columns = [location % length for location in range(0, self.size)]
+        self.horizontals = []
+        self.verticals = []
+        self.neighbours = []
+        for location in range(0, self.size):
+            west = [location - 1] if self.columns[location] > 0 else []
+            east = [location + 1] if self.columns[location] < length - 1 else []
+            north = [location - length] if self.rows[location] > 0 else []
+            south = [location + length] if self.rows[location] < length - 1 else []
+            self.horizontals.append(west + east)
+            self.verticals.append(north + south)
+            self.neighbours.append(west + north + east + south)
+        self.bitMasks = None
+
+    @staticmethod
+    def forLength(length):
+        """
+        Return the shared topology for a map length, building it on first use.
+        :param length: Int.
+        :return: topology.
+        """
+        if length not in topology.cache:
+            topology.cache[length] = topology(length)
+        return topology.cache[length]
+
+    def validOffset(self, location, offset):
+        """
+        Return True if moving offset from location stays on the map, only cardinal offsets are valid.
+        :param location: Index.
+        :param offset: Int.
+        :return: Bool.
+        """
+        if offset == -1:
+            return self.columns[location] > 0
+        if offset == +1:
+            return self.columns[location] < self.length - 1
+        if offset == -self.length:
+            return self.rows[location] > 0
+        if offset == +self.length:
+            return self.rows[location] < self.length - 1
+        return False
+
+    def availableSpace(self, location, orientation, offset):
+        """
+        Return the number of tiles from location to the edge of the map, location included.
+        :param location: Index.
+        :param orientation: Char.
+        :param offset: Int.
+        :return: Int.
+        """
+        if orientation == "H":
+            return self.length - self.columns[location]
+        if offset < 0:
+            return self.rows[location] + 1
+        return self.length - self.rows[location]
+
+
+class sparseTopology(topology):
+    """Topology of a very large map, computing coordinates and neighbours when asked instead of storing them."""
+
+    cache = {}
+
+    def __init__(self, length):
+        """
+        Create tables that compute each entry on access.
+        :param length: Int, length of the map.
+        """
+        self.length = length
+        self.size = length ** 2
+        self.rows = computedTable(lambda location: location // length, self.size)
+        self.columns = computedTable(lambda location: location % length, self.size)
+        self.horizontals = computedTable(self.__horizontals, self.size)
+        self.verticals = computedTable(self.__verticals, self.size)
+        self.neighbours = computedTable(self.__neighbours, self.size)
+        self.bitMasks = None
+
+    @staticmethod
+    def forLength(length):
+        """
+        Return the shared sparse topology for a map length.
+        :param length: Int.
+        :return: sparseTopology.
+        """
+        if length not in sparseTopology.cache:
+            sparseTopology.cache[length] = sparseTopology(length)
+        return sparseTopology.cache[length]
+
+    def __horizontals(self, location):
+        column = location % self.length
+        return ([location - 1] if column > 0 else []) + ([location + 1] if column < self.length - 1 else [])
+
+    def __verticals(self, location):
+        return (([location - self.length] if location >= self.length else []) +
+                ([location + self.length] if location < self.size - self.length else []))
+
+    def __neighbours(self, location):
+        west, east = location - 1, location + 1
+        north, south = location - self.length, location + self.length
+        column = location % self.length
+        return ([west] if column > 0 else []) + ([north] if north >= 0 else []) + \
+               ([east] if column < self.length - 1 else []) + ([south] if south < self.size else [])
+
+
 class tile(object):
-    """Object for all tiles."""
+    """Object for all tiles, a view onto the state code its map stores for the location."""
+
+    __slots__ = ("map", "location")
 
     def __init__(self, _map, location):
-        """Create blank entity and save location and map data"""
-        self.entity = ""
+        """Save location and map data, the entity lives in the map's cells"""
         self.map = _map
         self.location = location
 
+    @property
+    def entity(self):
+        return self.map.entities[self.map.cells[self.location]]
+
+    @entity.setter
+    def entity(self, value):
+        self.map.cells[self.location] = self.map.codes[value]
+
     def getImage(self):
         """
         Return image to display in terminal.
         :return: Char.
         """
-        if self.entity == "":
-            return "□"
-        if self.entity == "ship":
-            return "○"
-        if self.entity == "destroyedShip":
-            return "⊛"
-        if self.entity == "targeted":
-            return "■"
+        return self.map.images[self.map.cells[self.location]]
 
     def attack(self):
         """
         Return True if hit ship and store new cell data.
         :return: Bool.
         """
-        if self.entity == "ship":
-            self.entity = "destroyedShip"
-            return True
-        elif self.entity == "destroyedShip":
-            return True
-        else:
-            self.entity = "targeted"
-            return False
+        return self.map.attack(self.location)
 
     def hasAdjacentShip(self):
         """
         Return True if any ships adjacent to location.
         :return: Bool.
         """
-        cardinals = [-1, -self.map.length, +1, +self.map.length]
-        for index, item in enumerate(cardinals):
-            if self.validOffset(item):
-                if self.map.array[self.location + item].entity == "ship":
-                    return True
-        return False
+        return self.map.hasAdjacentShip(self.location)
 
     def availableSpace(self, orientation, offset):
         """
@@ -69,14 +478,7 @@ class tile(object):
         :param offset: Int.
         :return:
         """
-        count = 0
-        if orientation == "H":
-            while int(self.location / self.map.length) == int((self.location + count) / self.map.length):
-                count += 1
-        else:
-            while (self.location + count * offset >= 0) and (self.location + count * offset < self.map.length ** 2):
-                count += 1
-        return count
+        return self.map.topology.availableSpace(self.location, orientation, offset)
 
     def validOffset(self, offset):
         """
@@ -84,74 +486,35 @@ class tile(object):
         :param offset: Int.
         :return: Bool.
         """
-        if (self.location + offset < self.map.length ** 2) and (self.location + offset >= 0):
-            if abs(offset) == 1:
-                if int(self.location / self.map.length) == int((self.location + offset) / self.map.length):
-                    return True
-            if abs(offset) == self.map.length:
-                if (self.location + offset >= 0) and (self.location + offset < self.map.length ** 2):
-                    return True
-        return False
+        return self.map.topology.validOffset(self.location, offset)
 
 
 class knowledgeTile(tile):
     """Object for holding AI knowledge regarding a tile"""
 
-    def __init__(self, _map, location):
-        """Initialize as a possible location for a ship and save location and map data"""
-        self.entity = "possible"
-        self.map = _map
-        self.location = location
+    __slots__ = ()
 
-    def getImage(self):
-        """
-        Return image to display in terminal (debugging).
-        :return: Char.
-        """
-        if self.entity == "possible":
-            return "□"
-        if self.entity == "hit":
-            return "⊛"
-        if self.entity == "completedShip":
-            return "⊛"
-        if self.entity == "impossible":
-            return "■"
+    @property
+    def entity(self):
+        return self.map.entities[self.map.cells[self.location]]
 
-    def hasAdjacentShip(self):
-        """
-        Return True if any completeShips adjacent to location.
-        :return: Bool.
-        """
-        cardinals = [-1, -self.map.length, +1, +self.map.length]
-        for index, item in enumerate(cardinals):
-            if self.validOffset(item):
-                if self.map.array[self.location + item].entity == "completedShip":
-                    return True
-        return False
+    @entity.setter
+    def entity(self, value):
+        self.map.setEntity(self.location, value)
 
     def hasVerticalShip(self):
         """
         Return True if any hits north or south of location.
         :return: Bool.
         """
-        verticals = [-self.map.length, +self.map.length]
-        for index, item in enumerate(verticals):
-            if self.validOffset(item):
-                if self.map.array[self.location + item].entity == "hit":
-                    return True
-        return False
+        return self.map.hasVerticalShip(self.location)
 
     def hasHorizontalShip(self):
         """
         Return True if any hits east or west of location.
         :return: Bool.
         """
-        horizontals = [-1, +1]
-        for index, item in enumerate(horizontals):
-            if self.validOffset(item):
-                if self.map.array[self.location + item].entity == "hit":
-                    return True
-        return False
+        return self.map.hasHorizontalShip(self.location)
 
 
 class ship(object):
@@ -201,9 +564,8 @@ class ship(object):
     def validShipLocation(self):
         if self.location.availableSpace(self.orientation, self.offset) < self.length:
             return False, "Inadequate space to place ship"
-        for i in range(0, self.length):
-            if self.homeMap.array[self.location.location + self.offset * i].hasAdjacentShip():
-                return False, "Ship adjacent to chosen location"
+        if self.homeMap.shipAdjacent(self.location.location, self.length, self.offset):
+            return False, "Ship adjacent to chosen location"
         return True, "This shouldn't EVER print"
 
     def place(self, maxLength=0):
@@ -222,18 +584,232 @@ class ship(object):
                 self.__init__(self.homeMap)
 
 
+class fleetPlacer(object):
+    """Places fleets onto a map by sampling uniformly from the placements that are still legal."""
+
+    # random placements tried on a sparse map before falling back to building every legal placement
+    sampleAttempts = 1000
+
+    def __init__(self, homeMap):
+        """
+        Block tiles around ships already on the map.
+        :param homeMap: _Map class
+        """
+        self.homeMap = homeMap
+        self.topology = homeMap.topology
+        self.blocked = set()
+        self.legal = {}
+        self.__block(list(homeMap.shipIds))
+
+    def __cells(self, code, length):
+        """
+        Return the tiles covered by an encoded placement.
+        :param code: Int, start * 2 + 1 if vertical.
+        :param length: Int.
+        :return: List.
+        """
+        offset = -self.topology.length if code & 1 else +1
+        return [(code >> 1) + offset * i for i in range(0, length)]
+
+    def __block(self, locations):
+        """
+        Block ship tiles and their cardinals, removing every placement covering them.
+        :param locations: List of Index, ship tiles.
+        """
+        newlyBlocked = set()
+        for location in locations:
+            for index in [location] + self.topology.neighbours[location]:
+                if index not in self.blocked:
+                    newlyBlocked.add(index)
+        self.blocked.update(newlyBlocked)
+        for location in newlyBlocked:
+            column = self.topology.columns[location]
+            for length, placements in self.legal.items():
+                for i in range(0, min(length, column + 1)):
+                    placements.discard((location - i) << 1)
+                for i in range(0, length):
+                    start = location + self.topology.length * i
+                    if start >= self.topology.size:
+                        break
+                    placements.discard((start << 1) | 1)
+
+    def placements(self, length):
+        """
+        Return the bucket of legal placements of a length, building it on first use.
+        :param length: Int.
+        :return: bucket.
+        """
+        if length not in self.legal:
+            # free run of unblocked tiles starting at each location, eastwards and northwards
+            size = self.topology.size
+            eastRun = [0] * size
+            northRun = [0] * size
+            for location in range(size - 1, -1, -1):
+                if location not in self.blocked and self.topology.columns[location] < self.topology.length - 1:
+                    eastRun[location] = 1 + eastRun[location + 1]
+                elif location not in self.blocked:
+                    eastRun[location] = 1
+            for location in range(0, size):
+                if location not in self.blocked and location >= self.topology.length:
+                    northRun[location] = 1 + northRun[location - self.topology.length]
+                elif location not in self.blocked:
+                    northRun[location] = 1
+            codes = [start << 1 for start in range(0, size) if eastRun[start] >= length]
+            codes += [(start << 1) | 1 for start in range(0, size) if northRun[start] >= length]
+            self.legal[length] = sparseBucket(codes) if self.homeMap.sparse else bucket(2 * size, codes)
+        return self.legal[length]
+
+    def __sample(self, length):
+        """
+        Return a legal placement found by drawing placements uniformly from the whole map, None if none was found.
+        Used on sparse maps, where almost every placement is legal and building the placement bucket is costly.
+        :param length: Int.
+        :return: Int, encoded placement.
+        """
+        mapLength = self.topology.length
+        for i in range(0, self.sampleAttempts):
+            code = random.randrange(0, 2 * self.topology.size)
+            start = code >> 1
+            if code & 1:
+                if start // mapLength < length - 1:
+                    continue
+            elif start % mapLength > mapLength - length:
+                continue
+            if not any(location in self.blocked for location in self.__cells(code, length)):
+                return code
+        return None
+
+    def __choose(self, length):
+        """
+        Return a uniformly chosen legal placement of a length, None if there is none.
+        :param length: Int.
+        :return: Int, encoded placement.
+        """
+        if self.homeMap.sparse:
+            code = self.__sample(length)
+            if code is not None:
+                return code
+        placements = self.placements(length)
+        return placements.choice() if len(placements) > 0 else None
+
+    def __placeCode(self, code, length):
+        """
+        Place a ship at an encoded placement.
+        :param code: Int.
+        :param length: Int.
+        :return: Tuple, (startingPos, length, offset).
+        """
+        offset = -self.topology.length if code & 1 else +1
+        self.homeMap.placeShip(code >> 1, length, offset)
+        self.__block(self.__cells(code, length))
+        return code >> 1, length, offset
+
+    def place(self, length, remaining=()):
+        """
+        Place a ship of length at a uniformly chosen legal placement.
+        :param length: Int.
+        :param remaining: List, rest of the fleet, for error reporting.
+        :return: Tuple, (startingPos, length, offset).
+        """
+        code = self.__choose(length)
+        if code is None:
+            raise FleetPlacementError(length, [length] + list(remaining))
+        return self.__placeCode(code, length)
+
+    def placeFleet(self, lengths):
+        """
+        Place an explicit fleet, longest ships first.
+        :param lengths: List of Int.
+        :return: List of Tuple, (startingPos, length, offset).
+        """
+        lengths = sorted(lengths, reverse=True)
+        return [self.place(length, lengths[index + 1:]) for index, length in enumerate(lengths)]
+
+    def placeRandom(self, shipTiles):
+        """
+        Place a ship with a random length from 2 up to shipTiles, only picking lengths that still fit.
+        :param shipTiles: Int, ship tiles left to place.
+        :return: Tuple, (startingPos, length, offset).
+        """
+        lengths = list(range(2, min(shipTiles, self.topology.length) + 1))
+        while lengths:
+            length = random.choice(lengths)
+            code = self.__choose(length)
+            if code is not None:
+                return self.__placeCode(code, length)
+            lengths.remove(length)
+        raise FleetPlacementError(2, [shipTiles])
+
+
 class map_(object):
     """Object for each player's map."""
 
+    entities = ["", "ship", "destroyedShip", "targeted"]
+    codes = {entity: code for code, entity in enumerate(entities)}
+    images = ["□", "○", "⊛", "■"]
+    sparse = False
+    tileClass = tile
+
     def __init__(self, length):
         """
-        Create array and save length.
+        Create cells and save length.
         :param length: Int, length of map array to create
         """
-        self.array = []
         self.length = length
-        for x in range(0, length ** 2):
-            self.array.append(tile(self, x))
+        self.topology = topology.forLength(length)
+        self.clearFleet()
+        self.cells = bytearray(length ** 2)
+
+    @property
+    def array(self):
+        """
+        Return tile views onto the cells.
+        :return: tileArray.
+        """
+        return tileArray(self, self.tileClass)
+
+    def reset(self):
+        """Empty the map in place, reusing its storage for another game."""
+        self.clearFleet()
+        self.cells[:] = bytes(len(self.cells))
+
+    def clearFleet(self):
+        """Reset the accounting of ships placed on the map."""
+        self.shipIds = {}
+        self.shipPlacements = []
+        self.shipLengths = []
+        self.shipHealth = []
+        self.shipTilesLeft = 0
+        self.shipsAfloat = 0
+        self.lastSunk = None
+
+    def registerShip(self, startingPos, length, offset):
+        """
+        Record a new ship in the fleet accounting.
+        :param startingPos: Int, position for ship to start.
+        :param length: Int, length of ship.
+        :param offset: Int, whether horizontal or vertical.
+        """
+        shipId = len(self.shipLengths)
+        for i in range(0, length):
+            self.shipIds[startingPos + (offset * i)] = shipId
+        self.shipPlacements.append((startingPos, length, offset))
+        self.shipLengths.append(length)
+        self.shipHealth.append(length)
+        self.shipTilesLeft += length
+        self.shipsAfloat += 1
+
+    def shipHit(self, location):
+        """
+        Record a ship tile being destroyed, noting the ship in lastSunk if it was its last tile.
+        :param location: Index.
+        """
+        shipId = self.shipIds[location]
+        self.shipTilesLeft -= 1
+        self.shipHealth[shipId] -= 1
+        if self.shipHealth[shipId] == 0:
+            self.shipsAfloat -= 1
+            self.lastSunk = shipId
 
     def placeShip(self, startingPos, length, offset):
         """
@@ -242,304 +818,1055 @@ class map_(object):
         :param length: Int, length of ship.
         :param offset: Int, whether horizontal or vertical.
         """
+        self.registerShip(startingPos, length, offset)
         for i in range(0, length):
-            self.array[startingPos + (offset * i)].entity = "ship"
+            self.cells[startingPos + (offset * i)] = SHIP
+
+    def shipAdjacent(self, startingPos, length, offset):
+        """
+        Return True if any tile of a ship would be adjacent to an existing ship.
+        :param startingPos: Int, position for ship to start.
+        :param length: Int, length of ship.
+        :param offset: Int, whether horizontal or vertical.
+        :return: Bool.
+        """
+        for i in range(0, length):
+            if self.hasAdjacentShip(startingPos + (offset * i)):
+                return True
+        return False
+
+    def hasAdjacentShip(self, location):
+        """
+        Return True if any ships adjacent to location.
+        :param location: Index.
+        :return: Bool.
+        """
+        for index in self.topology.neighbours[location]:
+            if self.cells[index] == SHIP:
+                return True
+        return False
+
+    def attack(self, location):
+        """
+        Attack the tile at location, return True if a ship was hit.
+        lastSunk holds the id of the ship sunk by this attack, or None.
+        :param location: Index.
+        :return: Bool.
+        """
+        self.lastSunk = None
+        if self.cells[location] == SHIP:
+            self.cells[location] = DESTROYED_SHIP
+            self.shipHit(location)
+            return True
+        elif self.cells[location] == DESTROYED_SHIP:
+            return True
+        else:
+            self.cells[location] = TARGETED
+            return False
 
     def displayMap(self, shipVis):
         """
         Print map onto the screen.
         :param shipVis: Bool, whether to show unhit ships
         """
-        print(" ", end="")
-        for i in range(0, self.length):
-            print(i, end="")
-        for i in range(0, len(self.array)):
-            if i % self.length == 0:
-                print("\n" + str(i / self.length)[0], end="")
-            if (self.array[i].entity == "ship") and (shipVis is False):
-                print("□", end="")
-            else:
-                print(self.array[i].getImage(), end="")
-        print("\n", end="")
+        print("\n".join(externals.renderer.mapLines(self, shipVis)))
+        screen.invalidate()
 
     def hasShips(self):
         """
         return True if this map has sips.
         :return: Bool.
         """
-        for index, item in enumerate(self.array):
-            if item.entity == "ship":
-                return True
+        return self.shipTilesLeft > 0
+
+
+class bitTile(tile):
+    """View of a single tile of a bitMap, keeping the tile interface."""
+
+    __slots__ = ("bit",)
+
+    def __init__(self, _map, location):
+        """Save location and map data, the entity lives in the map's bit layers"""
+        self.map = _map
+        self.location = location
+        self.bit = 1 << location
+
+    @property
+    def entity(self):
+        if self.map.ships & self.bit:
+            if self.map.hits & self.bit:
+                return "destroyedShip"
+            return "ship"
+        if self.map.misses & self.bit:
+            return "targeted"
+        return ""
+
+    @entity.setter
+    def entity(self, value):
+        self.map.ships &= ~self.bit
+        self.map.hits &= ~self.bit
+        self.map.misses &= ~self.bit
+        if value == "ship":
+            self.map.ships |= self.bit
+        elif value == "destroyedShip":
+            self.map.ships |= self.bit
+            self.map.hits |= self.bit
+        elif value == "targeted":
+            self.map.misses |= self.bit
+
+    def getImage(self):
+        """
+        Return image to display in terminal.
+        :return: Char.
+        """
+        return self.map.images[self.map.codes[self.entity]]
+
+
+class bitMap(map_):
+    """Player's map storing ship, hit and miss layers as integer bitmasks."""
+
+    tileClass = bitTile
+
+    def __init__(self, length):
+        """
+        Create empty layers and save length.
+        :param length: Int, length of map array to create
+        """
+        self.length = length
+        self.ships = 0
+        self.hits = 0
+        self.misses = 0
+        self.clearFleet()
+        self.topology = topology.forLength(length)
+        if self.topology.bitMasks is None:
+            self.topology.bitMasks = self.__buildMasks(self.topology)
+        self.full, self.notFirstColumn, self.notLastColumn, self.neighbourMasks = self.topology.bitMasks
+
+    def reset(self):
+        """Empty the map in place, reusing its storage for another game."""
+        self.clearFleet()
+        self.ships = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def __buildMasks(mapTopology):
+        """
+        Build masks shared by every bitMap of the same length.
+        :param mapTopology: topology.
+        :return: Tuple, (full, notFirstColumn, notLastColumn, neighbourMasks).
+        """
+        full = (1 << mapTopology.size) - 1
+        firstColumn = 0
+        for row in range(0, mapTopology.length):
+            firstColumn |= 1 << (row * mapTopology.length)
+        lastColumn = firstColumn << (mapTopology.length - 1)
+        neighbourMasks = []
+        for location in range(0, mapTopology.size):
+            mask = 0
+            for neighbour in mapTopology.neighbours[location]:
+                mask |= 1 << neighbour
+            neighbourMasks.append(mask)
+        return full, full & ~firstColumn, full & ~lastColumn, neighbourMasks
+
+    def spread(self, mask):
+        """
+        Return every tile orthogonally adjacent to a tile in mask.
+        :param mask: Int.
+        :return: Int.
+        """
+        return (((mask << 1) & self.notFirstColumn) | ((mask >> 1) & self.notLastColumn) |
+                (mask << self.length) | (mask >> self.length)) & self.full
+
+    def shipMask(self, startingPos, length, offset):
+        """
+        Return the mask covered by a ship.
+        :param startingPos: Int, position for ship to start.
+        :param length: Int, length of ship.
+        :param offset: Int, whether horizontal or vertical.
+        :return: Int.
+        """
+        mask = 0
+        for i in range(0, length):
+            mask |= 1 << (startingPos + offset * i)
+        return mask
+
+    def placeShip(self, startingPos, length, offset):
+        """
+        Place ship onto map layers.
+        :param startingPos: Int, position for ship to start.
+        :param length: Int, length of ship.
+        :param offset: Int, whether horizontal or vertical.
+        """
+        self.registerShip(startingPos, length, offset)
+        self.ships |= self.shipMask(startingPos, length, offset)
+
+    def shipAdjacent(self, startingPos, length, offset):
+        """
+        Return True if any tile of a ship would be adjacent to an existing ship.
+        :param startingPos: Int, position for ship to start.
+        :param length: Int, length of ship.
+        :param offset: Int, whether horizontal or vertical.
+        :return: Bool.
+        """
+        return self.spread(self.shipMask(startingPos, length, offset)) & self.ships != 0
+
+    def hasAdjacentShip(self, location):
+        """
+        Return True if any ships adjacent to location.
+        :param location: Index.
+        :return: Bool.
+        """
+        return self.neighbourMasks[location] & self.ships != 0
+
+    def attack(self, location):
+        """
+        Attack the tile at location, return True if a ship was hit.
+        :param location: Index.
+        :return: Bool.
+        """
+        self.lastSunk = None
+        bit = 1 << location
+        if self.ships & bit:
+            if not self.hits & bit:
+                self.hits |= bit
+                self.shipHit(location)
+            return True
+        self.misses |= bit
         return False
 
 
+class sparseMap(map_):
+    """Player's map for very large boards, storing only ships and shots."""
+
+    sparse = True
+
+    def __init__(self, length):
+        """
+        Create empty sparse cells and save length.
+        :param length: Int, length of map array to create
+        """
+        self.length = length
+        self.topology = sparseTopology.forLength(length)
+        self.clearFleet()
+        self.cells = sparseCells(length ** 2, EMPTY)
+
+    def reset(self):
+        """Empty the map in place, reusing its storage for another game."""
+        self.clearFleet()
+        self.cells.codes.clear()
+
+
 class knowledgeMap(map_):
     """Object used for tracking AI knowledge"""
 
+    entities = ["possible", "hit", "completedShip", "impossible", "cardinalCheck", "likelyCardinal", "shipCheck"]
+    codes = {entity: code for code, entity in enumerate(entities)}
+    images = ["□", "⊛", "⊛", "■", None, None, None]
+    tileClass = knowledgeTile
+    # largest map whose Zobrist keys are precomputed, larger maps compute each key when used
+    keyTableLimit = 2 ** 16
+
     def __init__(self, length):
         """
-        Create array and save length.
+        Create cells and save length.
         :param length:
         """
-        self.array = []
         self.length = length
-        for x in range(0, length ** 2):
-            self.array.append(knowledgeTile(self, x))
+        self.topology = topology.forLength(length)
+        self.keys = self.zobristKeys(length ** 2)
+        self.hash = 0
+        self.cells = bytearray(length ** 2)
+        self.codeBuckets = [bucket(length ** 2) for entity in knowledgeMap.entities]
+        self.codeBuckets[POSSIBLE] = bucket.full(length ** 2)
+        self.buckets = {entity: self.codeBuckets[code] for code, entity in enumerate(knowledgeMap.entities)}
+
+    def reset(self):
+        """Forget everything in place, reusing the cells and buckets for another game."""
+        self.hash = 0
+        self.cells[:] = bytes(len(self.cells))
+        for code, codeBucket in enumerate(self.codeBuckets):
+            if code != POSSIBLE:
+                codeBucket.clear()
+        self.codeBuckets[POSSIBLE].fill()
+
+    @staticmethod
+    def zobristKeys(size):
+        """
+        Return the Zobrist keys of every location and code of a map size.
+        :param size: Int, number of locations.
+        :return: List of Int, or computedTable.
+        """
+        if size <= knowledgeMap.keyTableLimit:
+            return externals.decisionCache.zobristTable(size)
+        return computedTable(externals.decisionCache.zobristKey, size * externals.decisionCache.CODES_PER_LOCATION)
+
+    def setEntity(self, location, entity):
+        """
+        Change a tile's entity, keeping the bucket of each entity up to date.
+        All changes to knowledge must go through here.
+        :param location: Index.
+        :param entity: String.
+        """
+        self.__setCode(location, self.codes[entity])
+
+    def __setCode(self, location, code):
+        """
+        Change a tile's state code, keeping the bucket of each entity up to date.
+        :param location: Index.
+        :param code: Int.
+        """
+        first = location * externals.decisionCache.CODES_PER_LOCATION
+        self.hash ^= self.keys[first + self.cells[location]] ^ self.keys[first + code]
+        self.codeBuckets[self.cells[location]].discard(location)
+        self.cells[location] = code
+        self.codeBuckets[code].add(location)
+
+    def markMissed(self, location):
+        """
+        Hash a missed shot into the state, as later changes can hide the miss from the cells.
+        :param location: Index.
+        """
+        self.hash ^= self.keys[location * externals.decisionCache.CODES_PER_LOCATION + MISSED]
+
+    def markFired(self, location):
+        """
+        Hash a shot into the state, as a hit tile later takes codes untouched tiles can hold too.
+        :param location: Index.
+        """
+        self.hash ^= self.keys[location * externals.decisionCache.CODES_PER_LOCATION + FIRED]
+
+    def hasAdjacentShip(self, location):
+        """
+        Return True if any completeShips adjacent to location.
+        :param location: Index.
+        :return: Bool.
+        """
+        for index in self.topology.neighbours[location]:
+            if self.cells[index] == COMPLETED_SHIP:
+                return True
+        return False
+
+    def hasVerticalShip(self, location):
+        """
+        Return True if any hits north or south of location.
+        :param location: Index.
+        :return: Bool.
+        """
+        for index in self.topology.verticals[location]:
+            if self.cells[index] == HIT:
+                return True
+        return False
+
+    def hasHorizontalShip(self, location):
+        """
+        Return True if any hits east or west of location.
+        :param location: Index.
+        :return: Bool.
+        """
+        for index in self.topology.horizontals[location]:
+            if self.cells[index] == HIT:
+                return True
+        return False
+
+    def neighbours(self, location):
+        """
+        Return the locations of the four cardinals that are on the map.
+        :param location: Index.
+        :return: List.
+        """
+        return self.topology.neighbours[location]
+
+    def region(self, *entities):
+        """
+        Return the locations holding any of the entities together with their cardinals.
+        :param entities: Strings.
+        :return: Set.
+        """
+        locations = set()
+        for entity in entities:
+            for location in self.buckets[entity]:
+                locations.add(location)
+                locations.update(self.neighbours(location))
+        return locations
 
     def sunkShip(self):
         """Update knowledge to reflect ship being sunk."""
-        for index, item in enumerate(self.array):
-            if item.entity == "hit":
-                item.entity = "completedShip"
-            if item.hasAdjacentShip() is True:
-                item.entity = "impossible"
+        # only tiles on or next to a ship can change, visited in board order as the result depends on it
+        for index in sorted(self.region("hit", "completedShip")):
+            if self.cells[index] == HIT:
+                self.__setCode(index, COMPLETED_SHIP)
+            if self.hasAdjacentShip(index) is True:
+                self.__setCode(index, IMPOSSIBLE)
 
     def shipLocated(self, location):
         """
         Mark four cardinals as "cardinalCheck".
         :param location: Index.
         """
-        cardinals = [-1, -self.length, +1, +self.length]
-        for index, item in enumerate(cardinals):
-            if self.array[location].validOffset(item):
-                self.array[location + item].entity = "cardinalCheck"
+        for index in self.topology.neighbours[location]:
+            self.__setCode(index, CARDINAL_CHECK)
 
     def horizontalShip(self):
         """Remove "cardinalCheck" markers and place "shipCheck" markers for horizontal locations."""
-        for index, item in enumerate(self.array):
-            if item.entity == "cardinalCheck":
-                item.entity = "impossible"
-            if item.hasVerticalShip() and (item.entity != "hit") and (item.entity != "completedShip"):
-                item.entity = "impossible"
-            if item.hasHorizontalShip() and (item.entity != "hit") and (item.entity != "completedShip"):
-                item.entity = "shipCheck"
+        for index in self.region("hit").union(self.buckets["cardinalCheck"]):
+            if self.cells[index] == CARDINAL_CHECK:
+                self.__setCode(index, IMPOSSIBLE)
+            if self.hasVerticalShip(index) and (self.cells[index] != HIT) and (self.cells[index] != COMPLETED_SHIP):
+                self.__setCode(index, IMPOSSIBLE)
+            if self.hasHorizontalShip(index) and (self.cells[index] != HIT) and (self.cells[index] != COMPLETED_SHIP):
+                self.__setCode(index, SHIP_CHECK)
 
     def verticalShip(self):
         """Remove "cardinalCheck" markers and place "shipCheck" markers for vertical locations."""
-        for index, item in enumerate(self.array):
-            if item.entity == "cardinalCheck":
-                item.entity = "impossible"
-            if item.hasHorizontalShip() and (item.entity != "hit") and (item.entity != "completedShip"):
-                item.entity = "impossible"
-            elif item.hasVerticalShip() and (item.entity != "hit") and (item.entity != "completedShip"):
-                item.entity = "shipCheck"
+        for index in self.region("hit").union(self.buckets["cardinalCheck"]):
+            if self.cells[index] == CARDINAL_CHECK:
+                self.__setCode(index, IMPOSSIBLE)
+            if self.hasHorizontalShip(index) and (self.cells[index] != HIT) and (self.cells[index] != COMPLETED_SHIP):
+                self.__setCode(index, IMPOSSIBLE)
+            elif self.hasVerticalShip(index) and (self.cells[index] != HIT) and (self.cells[index] != COMPLETED_SHIP):
+                self.__setCode(index, SHIP_CHECK)
 
     def cardinalConfirmed(self, location):
         """
         Call appropriate ship direction function.
         :param location: Index.
         """
-        if self.array[location].hasHorizontalShip() is True:
+        if self.hasHorizontalShip(location) is True:
             self.horizontalShip()
         else:
             self.verticalShip()
 
     def horizontalChecked(self):
         """Replace vertical "cardinalCheck" with "likelyCardinal" markers."""
-        for index, item in enumerate(self.array):
-            if item.hasVerticalShip() is True:
-                item.entity = "likelyCardinal"
+        for index in sorted(self.region("hit")):
+            if self.hasVerticalShip(index) is True:
+                self.__setCode(index, LIKELY_CARDINAL)
 
     def verticalChecked(self):
         """Replace horizontal "cardinalCheck" with "likelyCardinal" markers."""
-        for index, item in enumerate(self.array):
-            if item.hasHorizontalShip() is True:
-                item.entity = "likelyCardinal"
+        for index in sorted(self.region("hit")):
+            if self.hasHorizontalShip(index) is True:
+                self.__setCode(index, LIKELY_CARDINAL)
 
     def cardinalChecked(self, location):
         """
         Call appropriate ship direction checked function.
         :param location: Index.
         """
-        if self.array[location].hasHorizontalShip() is True:
+        if self.hasHorizontalShip(location) is True:
             self.horizontalChecked()
         else:
             self.verticalChecked()
 
     def resetCardinalPriorities(self):
         """Reset all "likelyCardinal"s to "cardinalCheck"."""
-        for index, item in enumerate(self.array):
-            if item.entity == "likelyCardinal":
-                item.entity = "cardinalCheck"
+        for index in list(self.buckets["likelyCardinal"]):
+            self.__setCode(index, CARDINAL_CHECK)
 
     def shipCheckHit(self, location):
         """
         Mark next cardinal as "shipCheck"
         :param location: Index.
         """
-        horizontals = [-1, +1]
-        verticals = [-self.length, +self.length]
-        if self.array[location].hasHorizontalShip():
-            directionToCheck = horizontals
-        elif self.array[location].hasVerticalShip():
-            directionToCheck = verticals
-        for index, item in enumerate(directionToCheck):
-            if self.array[location].validOffset(item):
-                if self.array[location + item].entity != "hit":
-                    self.array[location + item].entity = "shipCheck"
+        if self.hasHorizontalShip(location):
+            directionToCheck = self.topology.horizontals[location]
+        elif self.hasVerticalShip(location):
+            directionToCheck = self.topology.verticals[location]
+        for index in directionToCheck:
+            if self.cells[index] != HIT:
+                self.__setCode(index, SHIP_CHECK)
 
     def highestPriority(self):
         """
         Return highest priority attack.
         :return: String.
         """
-        if any(item.entity == "likelyCardinal" for index, item in enumerate(self.array)):
-            return "likelyCardinal"
-        if any(item.entity == "cardinalCheck" for index, item in enumerate(self.array)):
-            return "cardinalCheck"
-        if any(item.entity == "shipCheck" for index, item in enumerate(self.array)):
-            return "shipCheck"
+        for entity in ("likelyCardinal", "cardinalCheck", "shipCheck"):
+            if len(self.buckets[entity]) > 0:
+                return entity
         return "possible"
 
 
+class sparseKnowledgeMap(knowledgeMap):
+    """AI knowledge for very large boards, storing only tiles that are no longer "possible"."""
+
+    sparse = True
+
+    def __init__(self, length):
+        """
+        Create sparse cells and buckets holding only what is stored.
+        :param length:
+        """
+        self.length = length
+        self.topology = sparseTopology.forLength(length)
+        self.keys = self.zobristKeys(length ** 2)
+        self.hash = 0
+        self.cells = sparseCells(length ** 2, POSSIBLE)
+        self.codeBuckets = [sparseBucket() for entity in knowledgeMap.entities]
+        self.codeBuckets[POSSIBLE] = impliedBucket(self.cells)
+        self.buckets = {entity: self.codeBuckets[code] for code, entity in enumerate(knowledgeMap.entities)}
+
+    def reset(self):
+        """Forget everything in place, reusing the buckets for another game."""
+        self.hash = 0
+        self.cells.codes.clear()
+        for codeBucket in self.codeBuckets:
+            codeBucket.clear()
+
+
 class player(object):
     """Base class for all players."""
 
-    def __init__(self, lengthOfMap):
+    mapClass = map_
+
+    def __init__(self, lengthOfMap, mapClass=None):
         """
         Create map class for all child classes.
         :param lengthOfMap: Int.
+        :param mapClass: Class, board backend, None for the class's mapClass.
         """
-        self.map = map_(lengthOfMap)
+        self.map = (self.mapClass if mapClass is None else mapClass)(lengthOfMap)
         self.targetMap = None
 
 
 class AI(player):
     """Object for AI player, derived from player base class."""
 
-    def __init__(self, lengthOfMap):
+    # explicit ship lengths, or None for random ships with a total length of fleetTiles
+    fleet = None
+    fleetTiles = 0
+
+    def __init__(self, lengthOfMap, mapClass=None):
         """
         Assign name, place ship, and create knowledgeMap to track knowns.
         :param lengthOfMap: Int.
+        :param mapClass: Class, board backend, None for the class's mapClass.
         """
-        super().__init__(lengthOfMap)
+        super().__init__(lengthOfMap, mapClass)
         self.__assignName()
-        self.__placeShip()
-        self.knowledge = knowledgeMap(lengthOfMap)
+        self.placeFleet(self.map)
+        self.knowledge = sparseKnowledgeMap(lengthOfMap) if self.map.sparse else knowledgeMap(lengthOfMap)
+        self.firedAt = set()
+        self.missedAt = set()
+        self.lastShot = None
+
+    def reset(self, seed=None):
+        """
+        Start a new game in place, reusing the maps, drawing from random exactly as a new AI would.
+        :param seed: Int, seed for the random module, None to leave it untouched.
+        """
+        if seed is not None:
+            random.seed(seed)
+        self.map.reset()
+        self.targetMap = None
+        self.__assignName()
+        self.placeFleet(self.map)
+        self.knowledge.reset()
+        self.firedAt.clear()
+        self.missedAt.clear()
+        self.lastShot = None
 
     def __assignName(self):
         """Assign a name for the AI"""
         self.name = externals.robotNames.newName()
 
-    def __placeShip(self):
-        """place own ships with a total length equal to totalLength"""
-        fails = 0
-        while self.shipsLeft > 1:
-            tempShip = ship(self.map)
-            tempShip.place(self.shipsLeft)
-            self.shipsLeft -= tempShip.length
-            del tempShip
+    @classmethod
+    def placeFleet(cls, homeMap):
+        """
+        Place the class's ships on a map, either the explicit fleet or random ships with a total length of fleetTiles.
+        :param homeMap: _Map class
+        """
+        placer = fleetPlacer(homeMap)
+        if cls.fleet is not None:
+            placer.placeFleet(cls.fleet)
+            return
+        shipTiles = cls.fleetTiles
+        while shipTiles > 1:
+            shipTiles -= placer.placeRandom(shipTiles)[1]
 
     def __callAttack(self, location):
         """
         call attack and update the knowledgeMap.
         :param location: Index.
         """
-        if self.targetMap.array[location].attack() is True:
-            self.knowledge.array[location].entity = "hit"
+        self.firedAt.add(location)
+        self.knowledge.markFired(location)
+        if self.targetMap.attack(location) is True:
+            self.knowledge.setEntity(location, "hit")
             return True
         else:
-            self.knowledge.array[location].entity = "impossible"
+            self.knowledge.setEntity(location, "impossible")
+            self.knowledge.markMissed(location)
+            self.missedAt.add(location)
             return False
 
-    def __updateKnowledge(self, location, attackInfo):
+    def __updateKnowledge(self, location, attackInfo, sunk):
         """
         Update knowledgeMap appropriately.
         :param location: Index.
         :param attackInfo: String.
+        :param sunk: Bool, whether the target map announced the shot sank a ship.
         """
-        if (attackInfo == "shipCheck") and (self.knowledge.array[location].entity == "hit"):
-            self.knowledge.shipCheckHit(location)
-            return "{} shipCheck hit {}".format(self.__class__, location)
-        if (attackInfo == "shipCheck") and (
-                not any(item.entity == "shipCheck" for index, item in enumerate(self.knowledge.array))):
+        if sunk:
             self.knowledge.sunkShip()
             return "{} Ship sunk {}".format(self.__class__, location)
-        elif (attackInfo == "possible") and (self.knowledge.array[location].entity == "hit"):
+        if (attackInfo == "shipCheck") and (self.knowledge.cells[location] == HIT):
+            self.knowledge.shipCheckHit(location)
+            return "{} shipCheck hit {}".format(self.__class__, location)
+        elif (attackInfo == "possible") and (self.knowledge.cells[location] == HIT):
             self.knowledge.shipLocated(location)
             return "{} Ship Located {}".format(self.__class__, location)
-        elif (attackInfo == "cardinalCheck") and (self.knowledge.array[location].entity == "hit"):
+        elif (attackInfo == "cardinalCheck") and (self.knowledge.cells[location] == HIT):
             self.knowledge.resetCardinalPriorities()
             self.knowledge.cardinalConfirmed(location)
             return "{} cardinalCheck hit {}".format(self.__class__, location)
-        elif (attackInfo == "cardinalCheck") and (self.knowledge.array[location].entity != "hit"):
+        elif (attackInfo == "cardinalCheck") and (self.knowledge.cells[location] != HIT):
             self.knowledge.resetCardinalPriorities()
             self.knowledge.cardinalChecked(location)
             return "{} cardinalCheck miss {}".format(self.__class__, location)
-        elif (attackInfo == "likelyCardinal") and (self.knowledge.array[location].entity == "hit"):
+        elif (attackInfo == "likelyCardinal") and (self.knowledge.cells[location] == HIT):
             self.knowledge.resetCardinalPriorities()
             self.knowledge.cardinalConfirmed(location)
             return "{} cardinalCheck hit {}".format(self.__class__, location)
-        elif (attackInfo == "likelyCardinal") and (self.knowledge.array[location].entity != "hit"):
+        elif (attackInfo == "likelyCardinal") and (self.knowledge.cells[location] != HIT):
             self.knowledge.resetCardinalPriorities()
             self.knowledge.cardinalChecked(location)
             return "{} cardinalCheck miss {}".format(self.__class__, location)
         else:
             return "{} {} {}".format(self.__class__, attackInfo, location)
 
+    def chooseLocation(self, highestPriority):
+        """
+        Return the location to attack out of those with the highest priority.
+        :param highestPriority: String.
+        :return: Index.
+        """
+        try:
+            return self.knowledge.buckets[highestPriority].choice()
+        except IndexError:
+            # knowledge can wrongly rule out every tile, fall back to anywhere not yet fired at
+            return random.choice([index for index in range(0, self.knowledge.length ** 2)
+                                  if index not in self.firedAt])
+
     def attack(self):
         """Call attack on appropriate location"""
         highestPriority = self.knowledge.highestPriority()
-        locationsToRandomise = []
-        for index, item in enumerate(self.knowledge.array):
-            if item.entity == highestPriority:
-                locationsToRandomise.append(index)
-        try:
-            locationToAttack = random.choice(locationsToRandomise)
-        except IndexError:
-            self.targetMap.displayMap(True)
-            return False
+        locationToAttack = self.chooseLocation(highestPriority)
+        self.lastShot = locationToAttack
         hit = self.__callAttack(locationToAttack)
-        logic = self.__updateKnowledge(locationToAttack, highestPriority)
+        logic = self.__updateKnowledge(locationToAttack, highestPriority, self.targetMap.lastSunk is not None)
         return hit, logic
 
 
 class easyAI(AI):
     """Easy difficulty AI, designed to make obvious errors in judgement and play worse than a normal human."""
 
-    def __init__(self, lengthOfMap):
-        """
-        Initialize easyAI with fewer ships than standard.
-        :param lengthOfMap: Int
-        """
-        self.shipsLeft = 8
-        super().__init__(lengthOfMap)
+    # fewer ships than standard
+    fleetTiles = 8
 
 
 class mediumAI(AI):
     """Medium difficulty AI, designed to be same skill level as a normal human."""
 
-    def __init__(self, lengthOfMap):
-        """
-        Initialize mediumAI with standard number of ships.
+    # standard number of ships
+    fleetTiles = 12
+
+
+class hardAI(AI):
+    """
+    Hard difficulty AI, designed to use more advanced algorithms and play better than a normal human.
+    Picks the tile covered by the most placements of the enemy ships still afloat consistent with its knowledge,
+    needs numpy on dense maps. The enemy fleet's lengths are public, and each sink announces the ship sunk.
+    Until its first hit those picks come from the opening book, precomputed once per board size and fleet.
+    Picks for a knowledge state seen before in the process come from the decisions cache.
+    """
+
+    # more ships than standard
+    fleetTiles = 16
+    hitWeight = 10
+    # "possible" tiles scored per shot on sparse maps, where scoring all of them is too slow
+    huntSamples = 4
+    # shots taken from the opening book before the first hit, 0 to always score the board
+    openingDepth = 100
+    # names the scoring rule in opening book keys, bump it whenever densityScores changes so old lines are not played
+    scoring = "density.2"
+    # best locations of each knowledge state seen, shared by every game played in the process
+    decisions = externals.decisionCache.lruCache()
+
+    def __init__(self, lengthOfMap, mapClass=None):
+        """
+        Initialize hardAI with no opening line or enemy fleet known yet.
         :param lengthOfMap: Int
+        :param mapClass: Class, board backend, None for the class's mapClass.
         """
-        self.shipsLeft = 12
-        super().__init__(lengthOfMap)
+        super().__init__(lengthOfMap, mapClass)
+        self.opening = None
+        self.densityLengths = None
 
+    def reset(self, seed=None):
+        """
+        Start a new game in place.
+        :param seed: Int, seed for the random module, None to leave it untouched.
+        """
+        super().reset(seed)
+        self.opening = None
+        self.densityLengths = None
 
-class hardAI(AI):
-    """Hard difficulty AI, designed to use more advanced algorithms and play better than a normal human."""
+    def attack(self):
+        """Call attack on appropriate location, keeping densityLengths to the lengths of the enemy ships afloat"""
+        if self.densityLengths is None:
+            self.densityLengths = sorted(self.targetMap.shipLengths)
+        hit, logic = super().attack()
+        if self.targetMap.lastSunk is not None:
+            self.densityLengths.remove(self.targetMap.shipLengths[self.targetMap.lastSunk])
+        return hit, logic
 
-    def __init__(self, lengthOfMap):
+    def shipCounts(self):
         """
-        Initialize hardAI with more ships than standard.
-        :param lengthOfMap: Int
+        Return each length of the enemy ships afloat with the number of ships of that length, shortest first.
+        :return: List of Tuple, (length, ships).
+        """
+        return list(Counter(self.densityLengths).items())
+
+    def densityScores(self):
+        """
+        Return the number of ship placements covering each tile, weighting placements through hits.
+        :return: numpy.ndarray, flattened.
+        """
+        length = self.knowledge.length
+        blocked = numpy.zeros(length ** 2, dtype=numpy.int32)
+        hits = numpy.zeros(length ** 2, dtype=numpy.int32)
+        for locations in (self.knowledge.buckets["impossible"].items, self.knowledge.buckets["completedShip"].items,
+                          list(self.missedAt)):
+            blocked[locations] = 1
+        hits[self.knowledge.buckets["hit"].items] = 1
+        return self.boardScores(blocked.reshape(length, length), hits.reshape(length, length))
+
+    def boardScores(self, blocked, hits):
+        """
+        Return the weighted number of placements covering each tile of a board.
+        :param blocked: numpy.ndarray, square, 1 where no ship can be.
+        :param hits: numpy.ndarray, square, 1 where a ship was hit.
+        :return: numpy.ndarray, flattened.
+        """
+        return (self.__lineScores(blocked, hits) + self.__lineScores(blocked.T, hits.T).T).reshape(-1)
+
+    def openingScores(self, missed):
+        """
+        Return densityScores() of a board where nothing but missed was fired at, for building the opening book.
+        :param missed: List of Index.
+        :return: numpy.ndarray, flattened.
+        """
+        length = self.knowledge.length
+        blocked = numpy.zeros(length ** 2, dtype=numpy.int32)
+        blocked[missed] = 1
+        return self.boardScores(blocked.reshape(length, length), numpy.zeros((length, length), dtype=numpy.int32))
+
+    def __openingMove(self):
+        """
+        Return the opening book's next shot, None once a shot has hit or the line is used up.
+        :return: Index.
+        """
+        if len(self.missedAt) != len(self.firedAt):
+            return None
+        if self.opening is None:
+            self.opening = externals.openingBook.shared.play(self.scoring, self.knowledge.length,
+                                                             tuple(self.densityLengths), self.openingScores,
+                                                             self.openingDepth)
+        return self.opening[len(self.firedAt)] if len(self.firedAt) < len(self.opening) else None
+
+    def __lineScores(self, blocked, hits):
+        """
+        Return the weighted number of horizontal placements covering each tile.
+        :param blocked: numpy.ndarray, 1 where no ship can be.
+        :param hits: numpy.ndarray, 1 where a ship was hit.
+        :return: numpy.ndarray.
+        """
+        length = blocked.shape[1]
+        blockedSums = self.__prefixSums(blocked)
+        hitSums = self.__prefixSums(hits)
+        columns = numpy.arange(0, length)
+        scores = numpy.zeros(blocked.shape)
+        for shipLength, ships in self.shipCounts():
+            if shipLength > length:
+                break
+            # weight of the window starting at each column, zero when a blocked tile is inside it
+            free = (blockedSums[:, shipLength:] - blockedSums[:, :-shipLength]) == 0
+            weights = ships * free * (1 + self.hitWeight * (hitSums[:, shipLength:] - hitSums[:, :-shipLength]))
+            weightSums = self.__prefixSums(weights)
+            last = numpy.minimum(columns, length - shipLength) + 1
+            first = numpy.maximum(columns - shipLength + 1, 0)
+            scores += weightSums[:, last] - weightSums[:, first]
+        return scores
+
+    @staticmethod
+    def __prefixSums(array):
+        """
+        Return running sums along each row, starting with a column of zeros.
+        :param array: numpy.ndarray.
+        :return: numpy.ndarray.
+        """
+        sums = numpy.zeros((array.shape[0], array.shape[1] + 1), dtype=numpy.int64)
+        numpy.cumsum(array, axis=1, out=sums[:, 1:])
+        return sums
+
+    def localScore(self, location):
+        """
+        Return densityScores()[location] by looking only at the tiles around location, for sparse maps.
+        :param location: Index.
+        :return: Int.
+        """
+        length = self.knowledge.length
+        cells = self.knowledge.cells
+        row, column = divmod(location, length)
+        score = 0
+        for step, position in ((1, column), (length, row)):
+            for shipLength, ships in self.shipCounts():
+                if shipLength > length:
+                    break
+                for first in range(max(0, position - shipLength + 1), min(position, length - shipLength) + 1):
+                    hits = 0
+                    for index in range(location + (first - position) * step,
+                                       location + (first - position + shipLength) * step, step):
+                        code = cells[index]
+                        if code == IMPOSSIBLE or code == COMPLETED_SHIP or index in self.missedAt:
+                            break
+                        hits += code == HIT
+                    else:
+                        score += ships * (1 + self.hitWeight * hits)
+        return score
+
+    def __chooseSparse(self, highestPriority):
+        """
+        Return the best location by localScore, hunting among a few sampled "possible" tiles.
+        :param highestPriority: String.
+        :return: Index.
+        """
+        locations = self.knowledge.buckets[highestPriority]
+        if highestPriority == "possible" and len(locations) > 0:
+            candidates = list({locations.choice() for i in range(0, self.huntSamples)})
+        else:
+            candidates = [location for location in locations if location not in self.firedAt]
+        if len(candidates) == 0:
+            return super().chooseLocation(highestPriority)
+        scores = [self.localScore(location) for location in candidates]
+        best = max(scores)
+        return random.choice([location for location, score in zip(candidates, scores) if score == best])
+
+    def chooseLocation(self, highestPriority):
+        """
+        Return the highest scoring location not yet fired at out of those with the highest priority.
+        :param highestPriority: String.
+        :return: Index.
+        """
+        if self.knowledge.sparse:
+            return self.__chooseSparse(highestPriority)
+        if numpy is not None and self.openingDepth > 0 and highestPriority == "possible":
+            location = self.__openingMove()
+            if location is not None:
+                return location
+        if numpy is None:
+            return super().chooseLocation(highestPriority)
+        key = (self.__class__, self.knowledge.length, tuple(self.densityLengths), self.knowledge.hash)
+        best = self.decisions.get(key)
+        if best is not None:
+            # only a hash collision can hand back tiles fired at already, recompute if nothing else is left
+            best = tuple(location for location in best if location not in self.firedAt) or None
+        if best is None:
+            # sorted so the choice depends only on the state, not on what the cache holds
+            candidates = sorted(location for location in self.knowledge.buckets[highestPriority]
+                                if location not in self.firedAt)
+            if len(candidates) == 0:
+                return super().chooseLocation(highestPriority)
+            if len(candidates) == 1:
+                best = tuple(candidates)
+            else:
+                candidates = numpy.array(candidates)
+                scores = self.densityScores()[candidates]
+                best = tuple(int(location) for location in candidates[scores == scores.max()])
+            self.decisions.put(key, best)
+        return best[0] if len(best) == 1 else random.choice(best)
+
+
+class monteCarloAI(AI):
+    """
+    AI sampling random enemy fleets consistent with its knowledge and firing at the tile they cover most often.
+    Sampling runs until a per move time budget is spent, more workers draw more fleets within the same budget.
+    How many fleets that is depends on the machine and its load, so seeded games only replay exactly with
+    moveBudget None and a maxSamples limit.
+    Knowledge holds only facts: hits, misses, and ships the enemy announced as sunk.
+    """
+
+    # as many ships as hardAI
+    fleetTiles = 16
+    # seconds of sampling per move and most draws per move, None for no limit, but not both
+    moveBudget = 0.05
+    maxSamples = None
+    # processes sampling alongside the AI's own process, 0 to sample in process only
+    workers = 0
+    pool = None
+    # seconds before the deadline sampling stops when workers are used, leaving time for their counts to arrive
+    replyMargin = 0.005
+
+    def __init__(self, lengthOfMap, mapClass=None):
         """
-        self.shipsLeft = 16
-        super().__init__(lengthOfMap)
+        Initialize monteCarloAI with no fleets sampled yet.
+        :param lengthOfMap: Int
+        :param mapClass: Class, board backend, None for the class's mapClass.
+        """
+        if self.moveBudget is None and self.maxSamples is None:
+            raise ValueError("monteCarloAI needs a moveBudget or a maxSamples, or sampling never stops")
+        super().__init__(lengthOfMap, mapClass)
+        self.samples = 0
+
+    def reset(self, seed=None):
+        """
+        Start a new game in place.
+        :param seed: Int, seed for the random module, None to leave it untouched.
+        """
+        super().reset(seed)
+        self.samples = 0
+
+    @classmethod
+    def sampleWorkers(cls):
+        """
+        Return the number of worker processes to sample in, 0 inside a daemonic process such as a
+        multiprocessing.Pool worker of tournament or the league, which may not start processes of its own.
+        :return: Int.
+        """
+        return 0 if multiprocessing.current_process().daemon else cls.workers
+
+    @classmethod
+    def workerPool(cls):
+        """
+        Return the process pool shared by every monteCarloAI, starting it on first use and shutting it down at exit.
+        :return: concurrent.futures.ProcessPoolExecutor.
+        """
+        if monteCarloAI.pool is None:
+            monteCarloAI.pool = concurrent.futures.ProcessPoolExecutor(cls.workers)
+            atexit.register(monteCarloAI.closePool)
+        return monteCarloAI.pool
+
+    @staticmethod
+    def closePool():
+        """Shut the shared process pool down, a later move starts a new one."""
+        if monteCarloAI.pool is not None:
+            monteCarloAI.pool.shutdown(cancel_futures=True)
+            monteCarloAI.pool = None
+            atexit.unregister(monteCarloAI.closePool)
+
+    def known(self):
+        """
+        Return what every sampled fleet must agree with: tiles no ship can be on, unsunk hits and ship tiles left.
+        Sunk ships block their own tiles and cardinals, as no other ship may touch them.
+        The ship tiles come from the enemy fleet, whose lengths are public.
+        :return: Tuple, (List of Index, List of Index, Int).
+        """
+        sunk = list(self.knowledge.buckets["completedShip"])
+        blocked = set(self.missedAt)
+        for location in sunk:
+            blocked.add(location)
+            blocked.update(self.knowledge.neighbours(location))
+        hits = sorted(self.knowledge.buckets["hit"])
+        return sorted(blocked), hits, sum(self.targetMap.shipLengths) - len(sunk)
+
+    def coverage(self):
+        """
+        Return how often sampled fleets cover each tile, sampling in the worker pool and this process at once.
+        Every process stops at one deadline set before any work is handed out, and workers that have not
+        answered by then are left out, so starting the pool and waiting for a free worker count against the budget.
+        :return: List of Int.
+        """
+        deadline = None if self.moveBudget is None else time.time() + self.moveBudget
+        blocked, hits, shipTiles = self.known()
+        length = self.knowledge.length
+        workers = self.sampleWorkers()
+        maxSamples = None if self.maxSamples is None else -(-self.maxSamples // (workers + 1))
+        if deadline is not None and workers > 0:
+            sampleDeadline = deadline - self.replyMargin
+        else:
+            sampleDeadline = deadline
+        futures = [self.workerPool().submit(externals.fleetSampling.coverage, length, blocked, hits, shipTiles,
+                                            sampleDeadline, maxSamples, random.getrandbits(64))
+                   for i in range(0, workers)]
+        sampler = externals.fleetSampling.fleetSampler(length, blocked, hits, shipTiles,
+                                                       random.Random(random.getrandbits(64)))
+        counts, samples = sampler.coverage(sampleDeadline, maxSamples)
+        if futures:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            done, late = concurrent.futures.wait(futures, timeout)
+            for future in late:
+                future.cancel()
+            for future in done:
+                workerCounts, workerSamples = future.result()
+                counts = [count + workerCount for count, workerCount in zip(counts, workerCounts)]
+                samples += workerSamples
+        self.samples += samples
+        return counts
+
+    def sunkShip(self, location):
+        """
+        Mark the ship sunk by a shot as completed, every hit joined to the shot as ships never touch.
+        :param location: Index, tile of the shot that sank it.
+        """
+        shipTiles = [location]
+        for index in shipTiles:
+            self.knowledge.setEntity(index, "completedShip")
+            for neighbour in self.knowledge.neighbours(index):
+                if self.knowledge.cells[neighbour] == HIT:
+                    shipTiles.append(neighbour)
+
+    def attack(self):
+        """Fire at the most covered tile, recording the outcome and any ship it sank"""
+        location = self.chooseLocation("possible")
+        self.lastShot = location
+        self.firedAt.add(location)
+        self.knowledge.markFired(location)
+        if self.targetMap.attack(location) is True:
+            self.knowledge.setEntity(location, "hit")
+            if self.targetMap.lastSunk is not None:
+                self.sunkShip(location)
+                return True, "{} Ship sunk {}".format(self.__class__, location)
+            return True, "{} hit {}".format(self.__class__, location)
+        self.knowledge.setEntity(location, "impossible")
+        self.knowledge.markMissed(location)
+        self.missedAt.add(location)
+        return False, "{} miss {}".format(self.__class__, location)
+
+    def chooseLocation(self, highestPriority):
+        """
+        Return the tile not yet fired at covered by the most sampled fleets.
+        :param highestPriority: String, used only if no fleet could be sampled.
+        :return: Index.
+        """
+        counts = self.coverage()
+        best = 0
+        candidates = []
+        for location, count in enumerate(counts):
+            if count < best or count == 0 or location in self.firedAt:
+                continue
+            if count > best:
+                best = count
+                candidates = []
+            candidates.append(location)
+        if len(candidates) == 0:
+            return super().chooseLocation(highestPriority)
+        return random.choice(candidates)
 
 
 class human(player):
     """Object for human player, derived from player base class."""
 
-    def __init__(self, lengthOfMap):
+    def __init__(self, lengthOfMap, mapClass=None):
         """
         Call the player object constructor and assign a name and place ship.
         :param lengthOfMap: Int.
+        :param mapClass: Class, board backend, None for the class's mapClass.
         """
-        super().__init__(lengthOfMap)
+        super().__init__(lengthOfMap, mapClass)
         self.shipsLeft = 12
+        self.view = None
         self.__assignName()
         self.__placeShip()
 
@@ -573,17 +1900,35 @@ class human(player):
         Take an input and attack using the given input, returns True is hit.
         :return: Bool
         """
+        if self.view is None:
+            self.view = externals.renderer.viewport.forTerminal(self.map.length, 2, len(screen.status) + 4)
         while True:
-            print("Your Map :", end="\n")
-            self.map.displayMap(False)
-            print("\n\n", end="")
-            print("Opponents Map :", end="\n")
-            self.targetMap.displayMap(False)
-            print("\n\n", end="")
-            attackLoc = inputInt("Where are you attacking {}? ".format(self.name))
+            screen.draw(externals.renderer.sideBySide([
+                ["Your Map :"] + externals.renderer.mapLines(self.map, False, self.view),
+                ["Opponents Map :"] + externals.renderer.mapLines(self.targetMap, False, self.view)]))
+            if self.view.fits():
+                attackLoc = inputInt("Where are you attacking {}? ".format(self.name))
+            else:
+                entry = input("Where are you attacking {}? (W/A/S/D to scroll) ".format(self.name)).strip().upper()
+                if entry in ("W", "A", "S", "D"):
+                    rows, columns = {"W": (-1, 0), "A": (0, -1), "S": (+1, 0), "D": (0, +1)}[entry]
+                    self.view.scroll(rows * (self.view.rows // 2 or 1), columns * (self.view.columns // 2 or 1))
+                    continue
+                try:
+                    attackLoc = int(entry)
+                except ValueError:
+                    print("Input is not an integer!")
+                    time.sleep(1)
+                    continue
             try:
-                if self.targetMap.array[attackLoc].attack() is True:
-                    print("Hit!")
+                if not 0 <= attackLoc < self.targetMap.length ** 2:
+                    raise IndexError(attackLoc)
+                self.view.follow(attackLoc)
+                if self.targetMap.attack(attackLoc) is True:
+                    if self.targetMap.lastSunk is not None:
+                        print("Hit! Ship sunk!")
+                    else:
+                        print("Hit!")
                     time.sleep(1)
                     return True, "Hit {}".format(attackLoc)
                 else:
@@ -592,14 +1937,46 @@ class human(player):
                     return False, "Miss {}".format(attackLoc)
             except IndexError:
                 print("Value entered not on map")
+                time.sleep(1)
+
+
+class gameResult(object):
+    """Object holding the outcome of a single game, used by simulations."""
+
+    def __init__(self, winner, loser, shots, turns, sunk, seed=None, winnerIndex=None):
+        """
+        Save outcome of a game.
+        :param winner: Class, class of the winning player.
+        :param loser: Class, class of the losing player.
+        :param shots: Tuple, shots fired by player one and player two.
+        :param turns: Int, number of volleys played.
+        :param sunk: Tuple, ships sunk by player one and player two.
+        :param seed: Int, seed the game was played with.
+        :param winnerIndex: Int, 0 if player one won, 1 if player two won.
+        """
+        self.winner = winner
+        self.winnerIndex = winnerIndex
+        self.loser = loser
+        self.shots = shots
+        self.turns = turns
+        self.sunk = sunk
+        self.seed = seed
+        self.record = None
+        self.profile = None
+        self.samples = None
+
+    def __repr__(self):
+        return "gameResult(winner={}, shots={}, turns={}, sunk={}, seed={})".format(
+            self.winner.__name__, self.shots, self.turns, self.sunk, self.seed)
 
 
 class game(object):
     """Game class for usage in main."""
 
-    def __init__(self, mapSize, gameConfig):
-        """Initialize mapSize, gameConfig, and players"""
+    def __init__(self, mapSize, gameConfig, mapClass=None):
+        """Initialize mapSize, gameConfig, board backend, and players"""
         self.mapSize = mapSize
+        self.mapClass = mapClass
         self.playerOne = None
         self.playerTwo = None
         self.gameConfig = gameConfig
@@ -625,25 +2002,36 @@ class game(object):
         :param difficulty: Char.
         """
         if difficulty == "E":
-            AIObject = easyAI(self.mapSize)
+            AIObject = easyAI(self.mapSize, self.mapClass)
         elif difficulty == "M":
-            AIObject = mediumAI(self.mapSize)
+            AIObject = mediumAI(self.mapSize, self.mapClass)
         elif difficulty == "H":
-            AIObject = hardAI(self.mapSize)
+            AIObject = hardAI(self.mapSize, self.mapClass)
         return AIObject
 
     def setTargetMaps(self):
         self.playerOne.targetMap = self.playerTwo.map
         self.playerTwo.targetMap = self.playerOne.map
 
+    def reset(self, seed=None):
+        """
+        Start a new AI against AI game in place, reusing both AIs and their maps.
+        :param seed: Int, seed for the random module, None to leave it untouched.
+        """
+        if seed is not None:
+            random.seed(seed)
+        self.playerOne.reset()
+        self.playerTwo.reset()
+        self.setTargetMaps()
+
     def setupGame(self):
         if self.gameConfig == "PP":
-            self.playerOne = human(self.mapSize)
+            self.playerOne = human(self.mapSize, self.mapClass)
             cls()
-            self.playerTwo = human(self.mapSize)
+            self.playerTwo = human(self.mapSize, self.mapClass)
             cls()
         if self.gameConfig == "PAI":
-            self.playerOne = human(self.mapSize)
+            self.playerOne = human(self.mapSize, self.mapClass)
             cls()
             self.playerTwo = self.setupAI(inputStr("What is the difficulty (E/M/H) ", ["E", "M", "H"]))
         if self.gameConfig == "AIAI":
@@ -660,23 +2048,19 @@ class game(object):
         playerTwoLogic = None
         while True:
             while True:
-                cls()
-                print(playerTwoLogic, end="\n\n")
+                screen.status = [str(playerTwoLogic), ""]
                 playerOneHit, playerOneLogic = self.playerOne.attack()
                 if playerOneHit is False:
                     break
-            self.playerTwo.map.displayMap(True)
             if self.playerTwo.map.hasShips() is False:
                 cls()
                 self.displayFinalScreen("{} has won!".format(self.playerOne.name))
                 return self.playerOne
             while True:
-                cls()
-                print(playerOneLogic, end="\n\n")
+                screen.status = [str(playerOneLogic), ""]
                 playerTwoHit, playerTwoLogic = self.playerTwo.attack()
                 if playerTwoHit is False:
                     break
-            self.playerOne.map.displayMap(True)
             if self.playerOne.map.hasShips() is False:
                 cls()
                 self.displayFinalScreen("{} has won!".format(self.playerTwo.name))
@@ -705,10 +2089,93 @@ class game(object):
                 print("{} has won!".format(self.playerTwo.__class__))
                 return self.playerTwo
 
+    def simulateLoop(self, record=False, samples=False):
+        """
+        Run through the game until someone wins without any terminal output.
+        Unlike AILoop the game stops on the shot that sinks the last ship.
+        :param record: Bool, keep the fleets and every shot in result.record.
+        :param samples: Bool, keep every shot with the shooter's knowledge before it in result.samples.
+        :return: gameResult.
+        """
+        players = (self.playerOne, self.playerTwo)
+        shots = [0, 0]
+        turns = 0
+        shotLog = array("I") if record else None
+        shotSamples = externals.selfPlayData.gameSamples(self.mapSize) if samples else None
+        while True:
+            for index, attacker in enumerate(players):
+                turns += 1
+                while True:
+                    shots[index] += 1
+                    if samples:
+                        knowledge = bytes(attacker.knowledge.cells)
+                    hit, logic = attacker.attack()
+                    if record:
+                        shotLog.append(attacker.lastShot << 2 | index << 1 | hit)
+                    if samples:
+                        shotSamples.add(knowledge, attacker.lastShot, index, hit)
+                    if hit is False:
+                        break
+                    if attacker.targetMap.hasShips() is False:
+                        sunk = tuple(len(item.targetMap.shipLengths) - item.targetMap.shipsAfloat for item in players)
+                        result = gameResult(attacker.__class__, players[1 - index].__class__, tuple(shots), turns, sunk,
+                                            winnerIndex=index)
+                        if record:
+                            result.record = externals.gameRecords.gameRecord(
+                                None, self.mapSize, tuple(item.__class__.__name__ for item in players), index,
+                                tuple(item.map.shipPlacements for item in players), shotLog)
+                        if samples:
+                            shotSamples.finish(result.shots, index)
+                            result.samples = shotSamples
+                        return result
+
+
+class gamePool(object):
+    """Fixed number of finished AI against AI games kept to be reset in place, instead of building new ones."""
+
+    def __init__(self, capacity=4):
+        """
+        Create an empty pool.
+        :param capacity: Int, most games kept, 0 to keep none.
+        """
+        self.capacity = capacity
+        self.games = OrderedDict()
+        self.reused = 0
+        self.built = 0
+
+    def take(self, key):
+        """
+        Return a kept game for key, removing it from the pool, None if there is none.
+        :param key: Tuple, (aiClassOne, aiClassTwo, mapSize, mapClass).
+        :return: game.
+        """
+        pooledGame = self.games.pop(key, None)
+        if pooledGame is None:
+            self.built += 1
+        else:
+            self.reused += 1
+        return pooledGame
+
+    def give(self, key, finishedGame):
+        """
+        Keep a finished game, dropping the least recently kept one if the pool is full.
+        :param key: Tuple, (aiClassOne, aiClassTwo, mapSize, mapClass).
+        :param finishedGame: game.
+        """
+        if self.capacity <= 0:
+            return
+        self.games[key] = finishedGame
+        while len(self.games) > self.capacity:
+            self.games.popitem(last=False)
+
+
+# games reused by simulate and by tournament games, in each worker process
+gameCache = gamePool()
+
 
 def cls():
-    """Print 100 new lines."""
-    print("\n" * 100)
+    """Clear the terminal."""
+    screen.clear()
 
 
 def inputInt(message):
@@ -741,6 +2208,209 @@ def inputStr(message, validEntries):
             print("Entry not valid!")
 
 
+def deriveSeed(baseSeed, gameIndex):
+    """
+    Return a seed for a single game derived from the tournament seed.
+    :param baseSeed: Int.
+    :param gameIndex: Int.
+    :return: Int.
+    """
+    digest = hashlib.blake2b("{}:{}".format(baseSeed, gameIndex).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def playGame(aiClassOne, aiClassTwo, mapSize, seed=None, mapClass=None, record=False, samples=False, games=None):
+    """
+    Play a single AI against AI game without any terminal I/O.
+    :param aiClassOne: Class, AI class for player one.
+    :param aiClassTwo: Class, AI class for player two.
+    :param mapSize: Int, length of the maps.
+    :param seed: Int, seed for the random module, None to leave it untouched.
+    :param mapClass: Class, board backend for both players, None for player.mapClass.
+    :param record: Bool, keep a gameRecord of the game in result.record.
+    :param samples: Bool, keep every shot with the shooter's knowledge in result.samples, dense maps only.
+    :param games: gamePool, to reset a kept game instead of building one and keep it afterwards, None for neither.
+    :return: gameResult, with the game's instrumentation counters in result.profile while it is enabled.
+    """
+    if seed is not None:
+        random.seed(seed)
+    if externals.instrumentation.enabled:
+        externals.instrumentation.gameStarted()
+    key = (aiClassOne, aiClassTwo, mapSize, mapClass)
+    simulatedGame = games.take(key) if games is not None else None
+    if simulatedGame is not None:
+        simulatedGame.reset()
+    else:
+        simulatedGame = game(mapSize, "AIAI", mapClass)
+        simulatedGame.playerOne = aiClassOne(mapSize, mapClass)
+        simulatedGame.playerTwo = aiClassTwo(mapSize, mapClass)
+        simulatedGame.setTargetMaps()
+    if samples and simulatedGame.playerOne.knowledge.sparse:
+        raise ValueError("self play samples need dense maps")
+    result = simulatedGame.simulateLoop(record, samples)
+    result.seed = seed
+    if record:
+        result.record.seed = seed
+    if externals.instrumentation.enabled:
+        result.profile = externals.instrumentation.gameFinished()
+    if games is not None:
+        games.give(key, simulatedGame)
+    return result
+
+
+def simulate(aiClassOne, aiClassTwo, mapSize, games=1, seed=None, mapClass=None):
+    """
+    Play AI against AI games without any terminal I/O.
+    :param aiClassOne: Class, AI class for player one.
+    :param aiClassTwo: Class, AI class for player two.
+    :param mapSize: Int, length of the maps.
+    :param games: Int, number of games to play.
+    :param seed: Int, seed each game is derived from, None to leave the random module untouched.
+    :param mapClass: Class, board backend for both players, None for player.mapClass.
+    :return: List of gameResult.
+    """
+    results = []
+    for i in range(0, games):
+        gameSeed = deriveSeed(seed, i) if seed is not None else None
+        results.append(playGame(aiClassOne, aiClassTwo, mapSize, gameSeed, mapClass, games=gameCache))
+    return results
+
+
+def _playTournamentGame(task):
+    """
+    Play one tournament game inside a worker process, enabling instrumentation there if the tournament has it.
+    :param task: Tuple, (index, aiClassOne, aiClassTwo, mapSize, seed, mapClass, record, samples, instrumented).
+    :return: Tuple, (index, gameResult).
+    """
+    if task[-1] and not externals.instrumentation.enabled:
+        externals.instrumentation.enable(modules[__name__])
+    return task[0], playGame(*task[1:-1], games=gameCache)
+
+
+def tournament(aiClassOne, aiClassTwo, mapSize, cycles, seed=None, workers=None, mapClass=None, recordPath=None,
+               stats=None, datasetPath=None, checkpointPath=None, checkpointInterval=30.0):
+    """
+    Play up to cycles games across a process pool, each with its own derived seed.
+    Any single game can be replayed with playGame and the seed in its result, and a resumed tournament plays the
+    games it has left as an uninterrupted one would. Neither holds for AIs that stop thinking on the clock, such as
+    monteCarloAI with a moveBudget, as how far they get depends on the machine's load.
+    Each process resets games kept in gameCache rather than building new ones, with identical results.
+    :param aiClassOne: Class, AI class for player one.
+    :param aiClassTwo: Class, AI class for player two.
+    :param mapSize: Int, length of the maps.
+    :param cycles: Int, number of games to play.
+    :param seed: Int, tournament seed, taken from the clock if None.
+    :param workers: Int, number of processes, defaults to the number of cores.
+    :param mapClass: Class, board backend for both players, None for player.mapClass.
+    :param recordPath: String, game record file every game is appended to as it finishes, None for no records.
+    :param stats: tournamentStats, fed every game, the tournament stops early once its sequential test decides.
+    :param datasetPath: String, directory every shot is streamed to as self play shards, None for no dataset.
+    :param checkpointPath: String, JSON file the tournament's progress is saved to and resumed from, None for none.
+    :param checkpointInterval: Float, seconds between checkpoints.
+    Games played in worker processes add their instrumentation counters to this process's totals.
+    A checkpoint holds the tournament's arguments, its seed and which games are finished, each game's random stream
+    being derived from them, with the wins, stats and how many records and dataset rows were written. A tournament
+    started again with the same arguments and checkpointPath skips the finished games and drops records and rows
+    written after the checkpoint, a checkpoint of another tournament raises ValueError.
+    The dataset's unfilled shard is saved beside the shards at every checkpoint, rather than cut short.
+    A checkpoint of a finished tournament is replaced by a new tournament.
+    :return: Dict, wins for each class.
+    """
+    names = (aiClassOne.__name__, aiClassTwo.__name__)
+    mapClassName = None if mapClass is None else mapClass.__name__
+    state = externals.checkpoint.load(checkpointPath) if checkpointPath is not None else None
+    if state is not None and state["finished"]:
+        state = None
+    resumed = state is not None
+    if resumed:
+        if (tuple(state["players"]), state["mapSize"], state["mapClass"], state["cycles"]) != (
+                names, mapSize, mapClassName, cycles):
+            raise ValueError("{} is the checkpoint of a different tournament".format(checkpointPath))
+        if seed is not None and seed != state["seed"]:
+            raise ValueError("{} is the checkpoint of a tournament with seed {}, not {}".format(
+                checkpointPath, state["seed"], seed))
+        seed = state["seed"]
+        state["done"] = set(state["done"])
+        if stats is not None and state["stats"] is not None:
+            stats.restore(state["stats"])
+    else:
+        if seed is None:
+            seed = int(time.time())
+        state = {"players": names, "mapSize": mapSize, "mapClass": mapClassName, "cycles": cycles, "seed": seed,
+                 "next": 0, "done": set(), "wins": {name: 0 for name in names}, "stats": None, "records": 0,
+                 "shards": (0, 0), "finished": False}
+    if workers is None:
+        workers = cpu_count() or 1
+    record = recordPath is not None
+    samples = datasetPath is not None
+    instrumented = externals.instrumentation.enabled
+    tasks = ((i, aiClassOne, aiClassTwo, mapSize, deriveSeed(seed, i), mapClass, record, samples, instrumented)
+             for i in range(state["next"], cycles) if i not in state["done"])
+    # a new tournament appends to any records and shards already there, a resumed one cuts them back first
+    writer = None
+    if record:
+        writer = externals.gameRecords.recordWriter(recordPath, keep=state["records"] if resumed else None)
+    shards = None
+    if samples:
+        shards = externals.selfPlayData.shardWriter(datasetPath, mapSize, resume=state["shards"] if resumed else None)
+    checkpoints = externals.checkpoint.checkpointWriter(checkpointPath) if checkpointPath is not None else None
+
+    def checkpoint():
+        """Save progress, saving records and dataset rows first so the checkpoint never counts games not on disk."""
+        if writer is not None:
+            writer.flush()
+            state["records"] = writer.count
+        if shards is not None:
+            state["shards"] = shards.checkpoint()
+        state["stats"] = None if stats is None else stats.state()
+        checkpoints.write(dict(state, done=sorted(state["done"])))
+
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    lastCheckpoint = time.perf_counter()
+    try:
+        if pool is None:
+            results = map(_playTournamentGame, tasks)
+        else:
+            results = pool.imap_unordered(_playTournamentGame, tasks, max(1, cycles // (workers * 16)))
+        for index, result in results:
+            state["wins"][names[result.winnerIndex]] += 1
+            if pool is not None and result.profile is not None:
+                externals.instrumentation.addGame(result.profile)
+            if writer is not None:
+                writer.write(result.record)
+            if shards is not None:
+                shards.write(result.samples)
+            state["done"].add(index)
+            while state["next"] in state["done"]:
+                state["done"].remove(state["next"])
+                state["next"] += 1
+            if stats is not None:
+                stats.addResult(result)
+                if stats.stopped():
+                    break
+            if checkpoints is not None and time.perf_counter() - lastCheckpoint >= checkpointInterval:
+                checkpoint()
+                lastCheckpoint = time.perf_counter()
+        else:
+            state["finished"] = state["next"] == cycles
+        if stats is not None and stats.stopped():
+            state["finished"] = True
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if checkpoints is not None:
+            checkpoint()
+            checkpoints.close()
+        if writer is not None:
+            writer.close()
+        if shards is not None:
+            shards.close()
+    wins = {aiClassOne: 0, aiClassTwo: 0}
+    for aiClass in (aiClassOne, aiClassTwo):
+        wins[aiClass] = state["wins"][aiClass.__name__]
+    return wins
+
+
 def main():
     """Call everything necessary to start game"""
     random.seed(int(time.time()))
@@ -752,8 +2422,22 @@ def main():
         mainGame.gameLoop()
         del mainGame
         return 0
+    checkpointPath = input("What file should the tournament be checkpointed to (blank for none)? ") or None
+    try:
+        saved = externals.checkpoint.load(checkpointPath) if checkpointPath is not None else None
+    except ValueError as error:
+        print(error)
+        return 1
+    if saved is not None and not saved["finished"] and inputStr(
+            "Resume the unfinished tournament of {} against {}, {} of {} games played (Y/N)? ".format(
+                saved["players"][0], saved["players"][1], saved["next"] + len(saved["done"]), saved["cycles"]),
+            ["Y", "N"]) == "Y":
+        difficulty1Class, difficulty2Class = (getattr(modules[__name__], name) for name in saved["players"])
+        mapSize, cycles, seed = saved["mapSize"], saved["cycles"], saved["seed"]
+        sequential = saved["stats"] is not None and saved["stats"]["sequential"]
     else:
-        winners = []
+        if saved is not None:
+            remove(checkpointPath)
         cycles = inputInt("What is the number of cycles? ")
         while True:
             try:
@@ -767,14 +2451,22 @@ def main():
                 print("Input is not derived from AI")
             else:
                 break
-        for i in range(0, cycles):
-            cyclesGame = game(mapSize, gameConfig)
-            cyclesGame.playerOne = difficulty1Class(mapSize)
-            cyclesGame.playerTwo = difficulty2Class(mapSize)
-            cyclesGame.setTargetMaps()
-            winners.append(cyclesGame.AILoop().__class__)
-        print("totals wins for {} : {}".format(difficulty1Class, winners.count(difficulty1Class)))
-        print("totals wins for {} : {}".format(difficulty2Class, winners.count(difficulty2Class)))
+        sequential = inputStr("Stop once one AI is better with 95% confidence (Y/N)? ", ["Y", "N"]) == "Y"
+        seed = int(time.time())
+    print("Tournament seed : {}".format(seed))
+    stats = externals.tournamentStats.tournamentStats((difficulty1Class.__name__, difficulty2Class.__name__),
+                                                      sequential=sequential)
+    try:
+        tournament(difficulty1Class, difficulty2Class, mapSize, cycles, seed, stats=stats,
+                   checkpointPath=checkpointPath)
+    except KeyboardInterrupt:
+        if checkpointPath is None:
+            print("\nTournament stopped")
+        else:
+            print("\nTournament stopped, run again to resume it from {}".format(checkpointPath))
+        return 1
+    print(stats.summary())
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+"""
+Asyncio server hosting many PP and PAI games over TCP, and a small client to play or load test it.
+
+Every connection speaks a line based protocol, one command or message per line, words separated by spaces.
+Client commands:
+    NAME <name>                        set the name shown to an opponent
+    PLAY AI <E|M|H> <size>             play against an AI
+    PLAY PP <size>                     play against the next human asking for the same size
+    PLACE <location> <H|V> <length>    place a ship while placing the fleet
+    AUTO                               place the rest of the fleet randomly
+    FIRE <location>                    attack on your turn
+    SHOW                               send both maps
+    QUIT
+Server messages:
+    WELCOME, PLACE <tiles left>, WAITING, START <opponent> <size> <FIRST|SECOND>, YOURTURN,
+    HIT|SUNK|MISS <location>, INCOMING HIT|SUNK|MISS <location>, MAP <line>, END, WIN [reason], LOSE [reason],
+    ERROR <message>
+"""
+import argparse
+import asyncio
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+import externals.openingBook
+import externals.renderer
+
+aiClasses = {"E": main.easyAI, "M": main.mediumAI, "H": main.hardAI}
+
+
+class ProtocolError(Exception):
+    """Raised when a client breaks the protocol, the message is sent back to it."""
+
+
+class connection(object):
+    """Line based connection to a single client."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, *words):
+        """
+        Queue a message, written without waiting for the client.
+        :param words: Objects, joined with spaces.
+        """
+        if not self.writer.is_closing():
+            self.writer.write((" ".join(str(word) for word in words) + "\n").encode())
+
+    async def receive(self):
+        """
+        Return the next command split into words, the first upper cased.
+        :return: List of String.
+        """
+        await self.writer.drain()
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("client disconnected")
+            words = line.decode(errors="replace").split()
+            if words:
+                return [words[0].upper()] + words[1:]
+
+    async def close(self):
+        if not self.writer.is_closing():
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+            self.writer.close()
+
+
+class remoteHuman(main.player):
+    """Human player on the other end of a connection."""
+
+    def __init__(self, lengthOfMap, name, client):
+        """
+        Create the player's map.
+        :param lengthOfMap: Int.
+        :param name: String.
+        :param client: connection.
+        """
+        super().__init__(lengthOfMap)
+        self.name = name
+        self.client = client
+        self.shipsLeft = 12
+
+    async def placeShips(self):
+        """Take PLACE and AUTO commands until the fleet is placed, following human.__placeShip's rules."""
+        while self.shipsLeft > 0:
+            self.client.send("PLACE", self.shipsLeft)
+            words = await self.client.receive()
+            if words[0] == "AUTO":
+                placer = main.fleetPlacer(self.map)
+                try:
+                    while self.shipsLeft > 1:
+                        self.shipsLeft -= placer.placeRandom(self.shipsLeft)[1]
+                except main.FleetPlacementError as error:
+                    self.client.send("ERROR", error)
+                self.shipsLeft = 0
+            elif words[0] == "PLACE" and len(words) == 4 and words[2].upper() in ("H", "V"):
+                try:
+                    location, length = int(words[1]), int(words[3])
+                except ValueError:
+                    self.client.send("ERROR location and length must be integers")
+                    continue
+                if not (0 <= location < self.map.length ** 2 and 1 <= length <= self.shipsLeft):
+                    self.client.send("ERROR ship is not on the map or is longer than the tiles left")
+                    continue
+                tempShip = main.ship(self.map)
+                tempShip.location = self.map.array[location]
+                tempShip.orientation = words[2].upper()
+                tempShip.offset = +1 if tempShip.orientation == "H" else -self.map.length
+                tempShip.length = length
+                valid, error = tempShip.validShipLocation()
+                if valid is False:
+                    self.client.send("ERROR", error)
+                else:
+                    tempShip.place()
+                    self.shipsLeft -= length
+            elif words[0] == "SHOW":
+                self.sendMaps()
+            else:
+                self.client.send("ERROR expected PLACE <location> <H|V> <length> or AUTO")
+
+    def sendMaps(self):
+        """Send the player's own map with ships and the opponent's map without."""
+        self.client.send("MAP Your Map :")
+        for line in externals.renderer.mapLines(self.map, True):
+            self.client.send("MAP", line)
+        if getattr(self, "targetMap", None) is not None:
+            self.client.send("MAP Opponents Map :")
+            for line in externals.renderer.mapLines(self.targetMap, False):
+                self.client.send("MAP", line)
+        self.client.send("END")
+
+    async def chooseLocation(self, timeout):
+        """
+        Ask for a shot until a valid location is given.
+        :param timeout: Float, seconds allowed for the move, None for no limit.
+        :return: Index.
+        """
+        self.client.send("YOURTURN")
+        while True:
+            words = await asyncio.wait_for(self.client.receive(), timeout)
+            if words[0] == "SHOW":
+                self.sendMaps()
+            elif words[0] == "FIRE" and len(words) == 2 and words[1].isdigit() and \
+                    int(words[1]) < self.targetMap.length ** 2:
+                return int(words[1])
+            elif words[0] == "QUIT":
+                raise ConnectionError("client quit")
+            else:
+                self.client.send("ERROR expected FIRE <location> on the map")
+
+
+class gameServer(object):
+    """Hosts any number of concurrent matches, running AI moves in a thread pool off the event loop."""
+
+    def __init__(self, moveTimeout=300, maxSize=100, aiThreads=4):
+        """
+        Create an idle server.
+        :param moveTimeout: Float, seconds a human has for each move or placement, None for no limit.
+        :param maxSize: Int, largest map length accepted.
+        :param aiThreads: Int, threads running AI moves.
+        """
+        self.moveTimeout = moveTimeout
+        self.maxSize = maxSize
+        self.executor = ThreadPoolExecutor(aiThreads)
+        self.waiting = {}
+        self.activeMatches = 0
+        self.finishedMatches = 0
+
+    async def serve(self, host, port):
+        """
+        Accept connections until cancelled.
+        :param host: String.
+        :param port: Int.
+        """
+        server = await asyncio.start_server(self.handle, host, port)
+        print("Serving on {}".format(", ".join(str(socket.getsockname()) for socket in server.sockets)))
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        """
+        Run one connection from greeting to the end of its match.
+        :param reader: asyncio.StreamReader.
+        :param writer: asyncio.StreamWriter.
+        """
+        client = connection(reader, writer)
+        try:
+            await self.session(client)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            await client.close()
+
+    async def session(self, client):
+        """
+        Take NAME and PLAY commands, then place the fleet and start or join a match.
+        :param client: connection.
+        """
+        client.send("WELCOME battleships")
+        name = "Player"
+        while True:
+            words = await asyncio.wait_for(client.receive(), self.moveTimeout)
+            try:
+                if words[0] == "NAME" and len(words) > 1:
+                    name = " ".join(words[1:])
+                elif words[0] == "QUIT":
+                    return
+                elif words[0] == "PLAY":
+                    mode, difficulty, mapSize = self.parsePlay(words)
+                    break
+                else:
+                    raise ProtocolError("expected NAME, PLAY or QUIT")
+            except ProtocolError as error:
+                client.send("ERROR", error)
+        loop = asyncio.get_running_loop()
+        human = remoteHuman(mapSize, name, client)
+        await asyncio.wait_for(human.placeShips(), self.moveTimeout)
+        if mode == "AI":
+            try:
+                opponent = await loop.run_in_executor(self.executor, aiClasses[difficulty], mapSize)
+            except main.FleetPlacementError as error:
+                client.send("ERROR", error)
+                return
+            await self.playMatch(human, opponent)
+        elif mapSize in self.waiting:
+            opponent, finished = self.waiting.pop(mapSize)
+            try:
+                await self.playMatch(opponent, human)
+            finally:
+                if not finished.done():
+                    finished.set_result(None)
+        else:
+            finished = loop.create_future()
+            self.waiting[mapSize] = (human, finished)
+            client.send("WAITING")
+            try:
+                await finished
+            except asyncio.CancelledError:
+                if self.waiting.get(mapSize, (None,))[0] is human:
+                    del self.waiting[mapSize]
+                raise
+
+    def parsePlay(self, words):
+        """
+        Return the mode, AI difficulty and map size of a PLAY command.
+        :param words: List of String.
+        :return: Tuple, (String, String, Int).
+        """
+        if len(words) == 4 and words[1].upper() == "AI" and words[2].upper() in aiClasses:
+            mode, difficulty, size = "AI", words[2].upper(), words[3]
+        elif len(words) == 3 and words[1].upper() == "PP":
+            mode, difficulty, size = "PP", None, words[2]
+        else:
+            raise ProtocolError("expected PLAY AI <E|M|H> <size> or PLAY PP <size>")
+        if not size.isdigit() or not 5 <= int(size) <= self.maxSize:
+            raise ProtocolError("size must be between 5 and {}".format(self.maxSize))
+        return mode, difficulty, int(size)
+
+    async def shoot(self, attacker):
+        """
+        Return where the attacker fires and whether it hit.
+        :param attacker: remoteHuman or AI.
+        :return: Tuple, (Index, Bool).
+        """
+        if isinstance(attacker, main.AI):
+            hit, logic = await asyncio.get_running_loop().run_in_executor(self.executor, attacker.attack)
+            return attacker.lastShot, hit
+        location = await attacker.chooseLocation(self.moveTimeout)
+        return location, attacker.targetMap.attack(location)
+
+    async def playMatch(self, playerOne, playerTwo):
+        """
+        Alternate volleys until a fleet is sunk or a human leaves, telling each human about every shot.
+        :param playerOne: remoteHuman or AI.
+        :param playerTwo: remoteHuman or AI.
+        """
+        players = (playerOne, playerTwo)
+        playerOne.targetMap = playerTwo.map
+        playerTwo.targetMap = playerOne.map
+        humans = [item for item in players if isinstance(item, remoteHuman)]
+        for index, item in enumerate(players):
+            if isinstance(item, remoteHuman):
+                item.client.send("START", players[1 - index].name.replace(" ", "_"), item.map.length,
+                                 ("FIRST", "SECOND")[index])
+        self.activeMatches += 1
+        index = 0
+        try:
+            while True:
+                attacker, defender = players[index], players[1 - index]
+                while True:
+                    try:
+                        location, hit = await self.shoot(attacker)
+                    except (ConnectionError, asyncio.TimeoutError) as error:
+                        attacker.client.send("LOSE", "timeout" if isinstance(error, asyncio.TimeoutError) else "quit")
+                        for item in humans:
+                            if item is not attacker:
+                                item.client.send("WIN opponent left")
+                        return
+                    outcome = "MISS"
+                    if hit:
+                        outcome = "HIT" if attacker.targetMap.lastSunk is None else "SUNK"
+                    if isinstance(attacker, remoteHuman):
+                        attacker.client.send(outcome, location)
+                    if isinstance(defender, remoteHuman):
+                        defender.client.send("INCOMING", outcome, location)
+                    if hit is False:
+                        break
+                    if attacker.targetMap.hasShips() is False:
+                        if isinstance(attacker, remoteHuman):
+                            attacker.client.send("WIN")
+                        if isinstance(defender, remoteHuman):
+                            defender.client.send("LOSE")
+                        return
+                index = 1 - index
+        finally:
+            self.activeMatches -= 1
+            self.finishedMatches += 1
+
+
+async def runClient(host, port):
+    """
+    Forward typed commands to the server and print everything it sends.
+    :param host: String.
+    :param port: Int.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+
+    async def forwardInput():
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            writer.write(line.encode())
+            await writer.drain()
+
+    inputTask = asyncio.ensure_future(forwardInput())
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        words = line.decode().rstrip("\n").split(" ")
+        print(" ".join(words[1:]) if words[0] == "MAP" else " ".join(words))
+        if words[0] in ("WIN", "LOSE"):
+            break
+    inputTask.cancel()
+    writer.close()
+
+
+async def runAutoClient(host, port, mode, difficulty, mapSize):
+    """
+    Play a whole match with random shots, for testing the server without anyone typing.
+    :param host: String.
+    :param port: Int.
+    :param mode: String, AI or PP.
+    :param difficulty: String, E, M or H, used against an AI.
+    :param mapSize: Int.
+    :return: String, WIN or LOSE.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    targets = list(range(0, mapSize ** 2))
+    random.shuffle(targets)
+    play = "PLAY AI {} {}".format(difficulty, mapSize) if mode == "AI" else "PLAY PP {}".format(mapSize)
+    writer.write("NAME autoClient\n{}\n".format(play).encode())
+    outcome = None
+    while outcome is None:
+        line = await reader.readline()
+        if not line:
+            break
+        words = line.decode().split()
+        if words[0] == "PLACE":
+            writer.write(b"AUTO\n")
+        elif words[0] == "YOURTURN":
+            writer.write("FIRE {}\n".format(targets.pop()).encode())
+        elif words[0] in ("WIN", "LOSE"):
+            outcome = words[0]
+        elif words[0] == "ERROR":
+            raise ProtocolError(" ".join(words[1:]))
+    writer.close()
+    return outcome
+
+
+async def loadTest(host, port, matches, mode, difficulty, mapSize):
+    """
+    Run many automatic clients at once and print how their matches ended.
+    :param host: String.
+    :param port: Int.
+    :param matches: Int, number of clients.
+    :param mode: String, AI or PP.
+    :param difficulty: String.
+    :param mapSize: Int.
+    """
+    start = asyncio.get_running_loop().time()
+    outcomes = await asyncio.gather(*[runAutoClient(host, port, mode, difficulty, mapSize)
+                                      for i in range(0, matches)])
+    elapsed = asyncio.get_running_loop().time() - start
+    print("{} clients finished in {:.1f}s, {} won, {} lost".format(
+        matches, elapsed, outcomes.count("WIN"), outcomes.count("LOSE")))
+
+
+def run():
+    """Parse arguments and run the server or a client."""
+    parser = argparse.ArgumentParser(description="Networked battleships server and client.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serveParser = commands.add_parser("serve", help="host matches")
+    clientParser = commands.add_parser("client", help="play on a server from this terminal")
+    autoParser = commands.add_parser("auto", help="run automatic clients against a server")
+    for commandParser in (serveParser, clientParser, autoParser):
+        commandParser.add_argument("--host", default="127.0.0.1")
+        commandParser.add_argument("--port", type=int, default=7654)
+    serveParser.add_argument("--timeout", type=float, default=300, help="seconds allowed per human move")
+    serveParser.add_argument("--max-size", type=int, default=100, dest="maxSize")
+    serveParser.add_argument("--ai-threads", type=int, default=4, dest="aiThreads")
+    serveParser.add_argument("--opening-book", dest="openingBook",
+                             help="file to keep hardAI's opening lines in across runs, in memory only if not given")
+    autoParser.add_argument("--matches", type=int, default=100)
+    autoParser.add_argument("--mode", choices=["AI", "PP"], default="AI")
+    autoParser.add_argument("--difficulty", choices=sorted(aiClasses), default="M")
+    autoParser.add_argument("--size", type=int, default=10)
+    arguments = parser.parse_args()
+
+    if arguments.command == "serve":
+        externals.openingBook.shared.path = arguments.openingBook
+        asyncio.run(gameServer(arguments.timeout, arguments.maxSize, arguments.aiThreads).serve(
+            arguments.host, arguments.port))
+    elif arguments.command == "client":
+        asyncio.run(runClient(arguments.host, arguments.port))
+    else:
+        asyncio.run(loadTest(arguments.host, arguments.port, arguments.matches, arguments.mode,
+                             arguments.difficulty, arguments.size))
+
+
+if __name__ == "__main__":
+    run()